@@ -1,16 +1,54 @@
 
 import argparse
 import asyncio
+import functools
 import sys
-from .crawler import run, parse_urls_from_file
+from itertools import filterfalse
+from types import MappingProxyType
+from typing import List
+
+# Preset safety modes (built once at import; read-only)
+_PRESETS = MappingProxyType({
+    "ultra-conservative": {
+        "concurrency": 2,
+        "delay": 3.0,
+        "jitter": 1.0,
+        "max_per_domain": 1,
+        "description": "Ultra-conservative (3-5 hrs/10k URLs, virtually zero block risk)"
+    },
+    "conservative": {
+        "concurrency": 5,
+        "delay": 1.0,
+        "jitter": 0.3,
+        "max_per_domain": 1,
+        "description": "Conservative (35-40 min/10k URLs, minimal risk) [DEFAULT]"
+    },
+    "balanced": {
+        "concurrency": 10,
+        "delay": 0.5,
+        "jitter": 0.2,
+        "max_per_domain": 2,
+        "description": "Balanced (16-18 min/10k URLs, low-medium risk)"
+    },
+    "aggressive": {
+        "concurrency": 20,
+        "delay": 0.0,
+        "jitter": 0.0,
+        "max_per_domain": 5,
+        "description": "Aggressive (8-10 min/10k URLs, HIGH RISK)"
+    }
+})
 
-def main():
+
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the CLI parser once per process (cached for repeated main() calls)."""
     p = argparse.ArgumentParser(description="HubSpot web detection crawler (Python)")
     p.add_argument("--url", action="append", help="URL to scan (can be repeated)")
     p.add_argument("--input", help="Path to file with URLs (one per line)")
 
     # Preset modes for common use cases
-    p.add_argument("--mode", choices=["ultra-conservative", "conservative", "balanced", "aggressive"],
+    p.add_argument("--mode", choices=tuple(_PRESETS),
                    help="Preset safety mode (overrides individual settings): "
                         "ultra-conservative (3-5 hrs/10k URLs, virtually zero block risk) [DEFAULT], "
                         "conservative (35-40 min/10k URLs, minimal risk), "
@@ -28,7 +66,7 @@ def main():
     p.add_argument("--insecure", action="store_true", help="Disable TLS certificate verification (DANGEROUS - allows MITM attacks)")
     p.add_argument("--user-agent", default="WhitehatHubSpotCrawler/1.0 (+https://whitehat-seo.co.uk)")
     p.add_argument("--out", help="Output file (JSONL, CSV, or Excel depending on --output-format)")
-    p.add_argument("--output-format", choices=["jsonl", "csv", "xlsx"], default="jsonl", help="Output format: jsonl (default), csv, or xlsx (Excel)")
+    p.add_argument("--output-format", choices=("jsonl", "csv", "xlsx"), default="jsonl", help="Output format: jsonl (default), csv, or xlsx (Excel)")
     p.add_argument("--pretty", action="store_true", help="Pretty-print JSON (only applies to jsonl format)")
     p.add_argument("--max-retries", type=int, default=3, help="Maximum retry attempts for failed requests (default: 3)")
     p.add_argument("--failures", help="Output file for failed URLs (JSONL)")
@@ -36,74 +74,112 @@ def main():
     p.add_argument("--try-variations", action="store_true", help="Try common URL variations (www, http/https, trailing slash) if original URL fails")
     p.add_argument("--max-variations", type=int, default=4, help="Maximum number of URL variations to try (default: 4)")
     p.add_argument("--progress-interval", type=int, default=10, help="Progress update frequency in URLs (default: 10)")
-    p.add_argument("--progress-style", choices=["compact", "detailed", "json"], default="compact", help="Progress output style (default: compact)")
+    p.add_argument("--progress-style", choices=("compact", "detailed", "json"), default="compact", help="Progress output style (default: compact)")
     p.add_argument("--quiet", action="store_true", help="Suppress progress output (errors only)")
 
     # Block detection parameters
     p.add_argument("--block-detection", action="store_true", help="Enable automatic IP blocking detection")
     p.add_argument("--block-threshold", type=int, default=5, help="Number of blocking failures to trigger alert (default: 5)")
     p.add_argument("--block-window", type=int, default=20, help="Sliding window size for tracking attempts (default: 20)")
-    p.add_argument("--block-action", choices=["pause", "warn", "abort"], default="pause", help="Action when blocking detected: pause (interactive), warn (continue), abort (exit) (default: pause)")
+    p.add_argument("--block-action", choices=("pause", "warn", "abort"), default="pause", help="Action when blocking detected: pause (interactive), warn (continue), abort (exit) (default: pause)")
     p.add_argument("--block-auto-resume", type=int, default=300, help="Auto-resume after N seconds in headless mode (default: 300, 0=never)")
 
-    args = p.parse_args()
+    return p
+
+
+def _parse_args(p: argparse.ArgumentParser, argv: List[str]) -> argparse.Namespace:
+    """Parse the command line, collecting --url values in a pre-pass.
+
+    argparse takes quadratic time over many repeated options (e.g. thousands
+    of --url flags), so "--url VALUE" and "--url=VALUE" are pulled out first
+    and only the remaining arguments go through p.parse_args(). A --url
+    without a value is left in place for argparse to report.
+    """
+    urls: List[str] = []
+    rest: List[str] = []
+    i, n = 0, len(argv)
+    while i < n:
+        arg = argv[i]
+        if arg == "--":
+            rest.extend(argv[i:])
+            break
+        if arg == "--url" and i + 1 < n and not argv[i + 1].startswith("-"):
+            urls.append(argv[i + 1])
+            i += 2
+            continue
+        if arg.startswith("--url="):
+            urls.append(arg[len("--url="):])
+        else:
+            rest.append(arg)
+        i += 1
+    args = p.parse_args(rest)
+    if urls:
+        args.url = urls + (args.url or [])
+    return args
+
+
+def _run_event_loop(coro):
+    """Run the crawl coroutine to completion, on uvloop when installed.
+
+    uvloop (optional 'fast' extra; not on Windows) is used through
+    uvloop.run(), which scopes the loop to this call instead of replacing
+    the process-wide event loop policy.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(coro)
+    return uvloop.run(coro)
+
+
+def main():
+    p = _build_parser()
+    args = _parse_args(p, sys.argv[1:])
+
+    # Load the checkpoint first so the input file can be filtered in the same
+    # pass that reads it
+    completed_urls = None
+    if args.checkpoint:
+        from .crawler import CompletedUrls
+        try:
+            completed_urls = CompletedUrls.from_file(args.checkpoint)
+        except FileNotFoundError:
+            pass  # First run: the crawler creates the checkpoint
 
     urls = []
+    file_counts = {"duplicates": 0, "excluded": 0}
     if args.input:
-        urls.extend(parse_urls_from_file(args.input))
+        # Deferred: importing the crawler pulls in httpx/lxml/playwright, which
+        # --help and argument errors should not pay for
+        from .crawler import parse_urls_from_file
+        if completed_urls:
+            # Fused read + dedup + checkpoint filter (one pass over the file)
+            urls.extend(parse_urls_from_file(args.input, dedup=True, exclude=completed_urls,
+                                             counts=file_counts))
+        else:
+            urls.extend(parse_urls_from_file(args.input))
     if args.url:
         urls.extend(args.url)
-    if not urls:
+    # An --input emptied by the checkpoint is reported as completed below
+    if not urls and not (args.input and completed_urls):
         p.error("Provide --url or --input")
 
+    # Startup notices, written to stderr in one call once setup is done
+    startup_msgs: List[str] = []
+
     # Deduplicate URLs while preserving order
-    seen = set()
-    deduped_urls = []
-    for url in urls:
-        if url not in seen:
-            seen.add(url)
-            deduped_urls.append(url)
-
-    if len(urls) != len(deduped_urls):
-        print(f"Removed {len(urls) - len(deduped_urls)} duplicate URLs", file=sys.stderr)
+    deduped_urls = list(dict.fromkeys(urls))
+
+    # Duplicates already dropped while reading --input count too
+    removed = file_counts["duplicates"] + len(urls) - len(deduped_urls)
+    if removed:
+        startup_msgs.append(f"Removed {removed} duplicate URLs")
     urls = deduped_urls
 
     # Apply preset mode if specified (can be overridden by individual parameters)
     mode = args.mode or "ultra-conservative"  # Default to ultra-conservative mode for maximum safety
 
-    # Define preset configurations
-    presets = {
-        "ultra-conservative": {
-            "concurrency": 2,
-            "delay": 3.0,
-            "jitter": 1.0,
-            "max_per_domain": 1,
-            "description": "Ultra-conservative (3-5 hrs/10k URLs, virtually zero block risk)"
-        },
-        "conservative": {
-            "concurrency": 5,
-            "delay": 1.0,
-            "jitter": 0.3,
-            "max_per_domain": 1,
-            "description": "Conservative (35-40 min/10k URLs, minimal risk) [DEFAULT]"
-        },
-        "balanced": {
-            "concurrency": 10,
-            "delay": 0.5,
-            "jitter": 0.2,
-            "max_per_domain": 2,
-            "description": "Balanced (16-18 min/10k URLs, low-medium risk)"
-        },
-        "aggressive": {
-            "concurrency": 20,
-            "delay": 0.0,
-            "jitter": 0.0,
-            "max_per_domain": 5,
-            "description": "Aggressive (8-10 min/10k URLs, HIGH RISK)"
-        }
-    }
-
-    preset = presets[mode]
+    preset = _PRESETS[mode]
 
     # Use preset values unless explicitly overridden
     concurrency = args.concurrency if args.concurrency is not None else preset["concurrency"]
@@ -111,27 +187,21 @@ def main():
     jitter = args.jitter if args.jitter is not None else preset["jitter"]
     max_per_domain = args.max_per_domain if args.max_per_domain is not None else preset["max_per_domain"]
 
-    # Validate numeric parameters
-    if concurrency <= 0:
-        p.error(f"--concurrency must be >= 1 (got {concurrency})")
-    if delay < 0:
-        p.error(f"--delay must be >= 0 (got {delay})")
-    if jitter < 0:
-        p.error(f"--jitter must be >= 0 (got {jitter})")
-    if max_per_domain <= 0:
-        p.error(f"--max-per-domain must be >= 1 (got {max_per_domain})")
-    if args.max_retries < 0:
-        p.error(f"--max-retries must be >= 0 (got {args.max_retries})")
-    if args.progress_interval <= 0:
-        p.error(f"--progress-interval must be >= 1 (got {args.progress_interval})")
-    if args.max_variations < 0:
-        p.error(f"--max-variations must be >= 0 (got {args.max_variations})")
-    if args.block_threshold <= 0:
-        p.error(f"--block-threshold must be >= 1 (got {args.block_threshold})")
-    if args.block_window <= 0:
-        p.error(f"--block-window must be >= 1 (got {args.block_window})")
-    if args.block_auto_resume < 0:
-        p.error(f"--block-auto-resume must be >= 0 (got {args.block_auto_resume})")
+    # Validate numeric parameters: (flag, value, minimum allowed)
+    for flag, value, minimum in (
+        ("--concurrency", concurrency, 1),
+        ("--delay", delay, 0),
+        ("--jitter", jitter, 0),
+        ("--max-per-domain", max_per_domain, 1),
+        ("--max-retries", args.max_retries, 0),
+        ("--progress-interval", args.progress_interval, 1),
+        ("--max-variations", args.max_variations, 0),
+        ("--block-threshold", args.block_threshold, 1),
+        ("--block-window", args.block_window, 1),
+        ("--block-auto-resume", args.block_auto_resume, 0),
+    ):
+        if value < minimum:
+            p.error(f"{flag} must be >= {minimum} (got {value})")
 
     # Validate block detection settings
     if args.quiet and args.block_detection and args.block_action == "pause":
@@ -140,33 +210,34 @@ def main():
 
     # Print mode selection if not quiet
     if not args.quiet:
-        print(f"Using mode: {preset['description']}", file=sys.stderr)
-        if args.concurrency is not None or args.delay is not None or args.jitter is not None or args.max_per_domain is not None:
-            print(f"Custom overrides applied: concurrency={concurrency}, delay={delay}, jitter={jitter}, max-per-domain={max_per_domain}", file=sys.stderr)
+        startup_msgs.append(f"Using mode: {preset['description']}")
+        if any(v is not None for v in (args.concurrency, args.delay, args.jitter, args.max_per_domain)):
+            startup_msgs.append(f"Custom overrides applied: concurrency={concurrency}, delay={delay}, jitter={jitter}, max-per-domain={max_per_domain}")
 
     # Resume from checkpoint if requested
-    completed_urls = set()
     if args.checkpoint:
-        import os
-        if os.path.exists(args.checkpoint):
-            with open(args.checkpoint, "r", encoding="utf-8") as f:
-                completed_urls = set(ln.strip() for ln in f if ln.strip())
+        if completed_urls:
             if not args.quiet:
-                print(f"Loaded {len(completed_urls)} completed URLs from checkpoint {args.checkpoint}", file=sys.stderr)
+                startup_msgs.append(f"Loaded {len(completed_urls)} completed URLs from checkpoint {args.checkpoint}")
 
-            # Filter out already-completed URLs
+            # Filter out already-completed URLs (--input was filtered while reading)
             urls_before = len(urls)
-            urls = [u for u in urls if u not in completed_urls]
-            skipped = urls_before - len(urls)
+            urls = list(filterfalse(completed_urls.__contains__, urls))
+            skipped = file_counts["excluded"] + urls_before - len(urls)
             if skipped > 0 and not args.quiet:
-                print(f"Skipping {skipped} already-completed URLs", file=sys.stderr)
+                startup_msgs.append(f"Skipping {skipped} already-completed URLs")
 
         if len(urls) == 0:
             if not args.quiet:
-                print("All URLs already completed!", file=sys.stderr)
+                startup_msgs.append("All URLs already completed!")
+                sys.stderr.write("\n".join(startup_msgs) + "\n")
             return
 
-    asyncio.run(run(urls, concurrency=concurrency, render=args.render, validate=args.validate, user_agent=args.user_agent, output=args.out, output_format=args.output_format, pretty=args.pretty, max_retries=args.max_retries, failures_output=args.failures, checkpoint_file=args.checkpoint, try_variations=args.try_variations, max_variations=args.max_variations, progress_interval=args.progress_interval, progress_style=args.progress_style, quiet=args.quiet, delay=delay, jitter=jitter, max_per_domain=max_per_domain, block_detection=args.block_detection, block_threshold=args.block_threshold, block_window=args.block_window, block_action=args.block_action, block_auto_resume=args.block_auto_resume, insecure=args.insecure))
+    if startup_msgs:
+        sys.stderr.write("\n".join(startup_msgs) + "\n")
+
+    from .crawler import run
+    _run_event_loop(run(urls, concurrency=concurrency, render=args.render, validate=args.validate, user_agent=args.user_agent, output=args.out, output_format=args.output_format, pretty=args.pretty, max_retries=args.max_retries, failures_output=args.failures, checkpoint_file=args.checkpoint, try_variations=args.try_variations, max_variations=args.max_variations, progress_interval=args.progress_interval, progress_style=args.progress_style, quiet=args.quiet, delay=delay, jitter=jitter, max_per_domain=max_per_domain, block_detection=args.block_detection, block_threshold=args.block_threshold, block_window=args.block_window, block_action=args.block_action, block_auto_resume=args.block_auto_resume, insecure=args.insecure))
 
 if __name__ == "__main__":
     main()
@@ -1,5 +1,7 @@
 
 import asyncio
+import functools
+import os
 import re
 import sys
 import json
@@ -8,12 +10,13 @@ import random
 import urllib.parse
 import select
 from collections import deque
-from datetime import datetime
-from typing import List, Tuple, Optional, Dict, Any, Set
+from concurrent.futures import Executor, ThreadPoolExecutor
+from itertools import filterfalse
+from typing import Callable, Container, Iterable, Iterator, List, Tuple, Optional, Dict, Any, Set, Sized
 
 import httpx
-from bs4 import BeautifulSoup
-from .detector import detect_html, detect_network, make_result, RX
+import lxml.html
+from .detector import detect_html, detect_network, make_result, RX, _iso_now
 
 # Optional: jsonschema validation
 try:
@@ -29,9 +32,88 @@ try:
 except Exception:
     _HAS_PLAYWRIGHT = False
 
+# Optional: selectolax (Lexbor) for faster HTML parsing (lxml otherwise)
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    _HAS_SELECTOLAX = True
+except Exception:
+    _HAS_SELECTOLAX = False
+
+# Optional: orjson for faster JSON encoding (stdlib json otherwise)
+try:
+    import orjson
+    _HAS_ORJSON = True
+except Exception:
+    _HAS_ORJSON = False
+
+
+def _json_bytes(obj: Any, pretty: bool = False) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes, using orjson when installed.
+
+    The json fallback is configured to match orjson byte for byte (compact
+    separators, non-ASCII written as UTF-8), so output does not depend on
+    whether the 'fast' extra is installed.
+    """
+    if _HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
 
 DEFAULT_UA = "WhitehatHubSpotCrawler/1.0 (+https://whitehat-seo.co.uk)"
 TIMEOUT = 20.0
+# "error" field of failure results
+ERR_MSG_RETRIES = "Failed after all retry attempts"
+# Output files are flushed every FLUSH_EVERY rows or after FLUSH_SECS seconds,
+# whichever comes first, rather than per row; the checkpoint follows the flushes
+FLUSH_EVERY = 256
+FLUSH_SECS = 1.0
+# Most queued results a writer coalesces into one write() call
+WRITE_BATCH = 256
+
+_UTF8_HTML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+
+# Hot-path pattern bound once (RX entries are already compiled)
+_COOKIE_ANY_RE = RX["cookie_any"]
+# Exception text that BlockDetector treats as a network-level blocking signal
+_BLOCKING_ERR_RE = re.compile(r"connection reset|tls|ssl|clientconnectorerror|connectionreseterror", re.IGNORECASE)
+# Retry classification of untyped errors (anything that is not a FetchError)
+_RATE_LIMITED_ERR_RE = re.compile(r"\b429\b|too many requests", re.IGNORECASE)
+_FORBIDDEN_ERR_RE = re.compile(r"\b403\b|forbidden", re.IGNORECASE)
+_TRANSIENT_ERR_RE = re.compile(r"timeout|connection|network|dns", re.IGNORECASE)
+# Leading URL scheme ("ftp:", "mailto:"); a colon followed by a digit is a
+# host:port, not a scheme
+_SCHEME_RE = re.compile(r"[A-Za-z][A-Za-z0-9+.-]*:(?!\d)")
+
+
+def _parse_html(html: str) -> "lxml.html.HtmlElement":
+    """Parse an HTML document with lxml (raises on empty/unparseable input)."""
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # str input with an XML encoding declaration (e.g. XHTML) is rejected
+        # by lxml; hand it the UTF-8 bytes instead
+        return lxml.html.document_fromstring(html.encode("utf-8"), parser=_UTF8_HTML_PARSER)
+
+
+def _metadata_from_doc(doc: Optional["lxml.html.HtmlElement"]) -> dict:
+    """Extract title/description from an already-parsed document (None = unparseable)."""
+    title = None
+    description = None
+    if doc is not None:
+        title_tag = doc.find(".//title")
+        if title_tag is not None:
+            title = title_tag.text_content().strip() or None  # Convert empty string to None
+
+        meta_desc = doc.xpath('.//meta[@name="description"]')
+        if meta_desc:
+            description = (meta_desc[0].get("content") or "").strip() or None
+
+    return {
+        "title": title,
+        "description": description
+    }
 
 
 def extract_page_metadata(html: str) -> dict:
@@ -42,30 +124,14 @@ def extract_page_metadata(html: str) -> dict:
         - title: Content of <title> tag (or None)
         - description: Content of meta description tag (or None)
     """
-    try:
-        soup = BeautifulSoup(html, "lxml")
-
-        # Extract title
-        title_tag = soup.find("title")
-        title = title_tag.get_text(strip=True) if title_tag else ""
-        title = title if title else None  # Convert empty string to None
+    return _parse_and_extract(html, "", False)[0]
 
-        # Extract meta description
-        description = None
-        meta_desc = soup.find("meta", attrs={"name": "description"})
-        if meta_desc:
-            description = meta_desc.get("content", "").strip() or None
 
-        return {
-            "title": title,
-            "description": description
-        }
-    except Exception:
-        # If parsing fails, return None values
-        return {
-            "title": None,
-            "description": None
-        }
+@functools.lru_cache(maxsize=8192)
+def _split(url: str) -> urllib.parse.SplitResult:
+    """urlsplit, memoized: the same URL is split for domain limiting, block
+    detection and variation generation."""
+    return urllib.parse.urlsplit(url)
 
 
 class ProgressTracker:
@@ -101,37 +167,41 @@ class ProgressTracker:
 
     def update_from_result(self, result: dict):
         """Update statistics from a successful detection result"""
-        # Check if HubSpot was found (any positive indicator)
-        summary = result.get("summary", {})
-        has_hubspot = (
-            summary.get("tracking", False) or
-            summary.get("cmsHosting", False) or
-            any(summary.get("features", {}).values())
-        )
-
-        if has_hubspot:
+        summary = result.get("summary") or {}
+        s_get = summary.get
+        f_get = (s_get("features") or {}).get
+
+        tracking = s_get("tracking")
+        cms = s_get("cmsHosting")
+        forms = f_get("forms")
+        chat = f_get("chat")
+        video = f_get("video")
+        meetings = f_get("meetings")
+        email = f_get("emailTrackingIndicators")
+
+        # Check if HubSpot was found (any positive indicator; these are all
+        # the features summarise() produces)
+        if tracking or cms or forms or chat or video or meetings or email or f_get("ctasLegacy"):
             self.hubspot_found += 1
 
         # Track individual features
-        if summary.get("tracking"):
+        if tracking:
             self.tracking_count += 1
-        if summary.get("cmsHosting"):
+        if cms:
             self.cms_count += 1
-
-        features = summary.get("features", {})
-        if features.get("forms"):
+        if forms:
             self.forms_count += 1
-        if features.get("chat"):
+        if chat:
             self.chat_count += 1
-        if features.get("video"):
+        if video:
             self.video_count += 1
-        if features.get("meetings"):
+        if meetings:
             self.meetings_count += 1
-        if features.get("emailTrackingIndicators"):
+        if email:
             self.email_count += 1
 
         # Track confidence
-        confidence = summary.get("confidence", "").lower()
+        confidence = (s_get("confidence") or "").lower()
         if confidence == "definitive":
             self.definitive_count += 1
         elif confidence == "strong":
@@ -246,7 +316,7 @@ class ProgressTracker:
                 "weak": self.weak_count
             }
         }
-        return json.dumps(data)
+        return _json_bytes(data).decode("utf-8")
 
 
 class BlockDetector:
@@ -264,6 +334,8 @@ class BlockDetector:
         self.window_size = window_size
         # Track recent attempts: (url, domain, is_blocking, timestamp)
         self.recent_attempts: deque = deque(maxlen=window_size)
+        # Number of blocking attempts currently in recent_attempts
+        self.blocking_count = 0
         # Track failed URLs for potential retry
         self.failed_urls_for_retry: deque = deque(maxlen=50)
 
@@ -276,8 +348,7 @@ class BlockDetector:
         - HTTP 403 (Forbidden) or 429 (Rate Limit)
         - Connection errors, TLS failures, connection resets
         """
-        parsed = urllib.parse.urlparse(url)
-        domain = parsed.netloc
+        domain = _split(url).netloc
 
         # Determine if this is a blocking-type failure
         is_blocking = False
@@ -287,16 +358,13 @@ class BlockDetector:
                 is_blocking = True
             # Network-level errors that indicate blocking
             elif exception:
-                error_msg = str(exception).lower()
-                blocking_errors = [
-                    'connection reset',
-                    'tls',
-                    'ssl',
-                    'clientconnectorerror',
-                    'connectionreseterror'
-                ]
-                is_blocking = any(err in error_msg for err in blocking_errors)
+                is_blocking = _BLOCKING_ERR_RE.search(str(exception)) is not None
 
+        # Keep blocking_count in step with the window (the oldest entry drops out when full)
+        if len(self.recent_attempts) == self.window_size and self.recent_attempts[0][2]:
+            self.blocking_count -= 1
+        if is_blocking:
+            self.blocking_count += 1
         self.recent_attempts.append((url, domain, is_blocking, time.time()))
 
         # Save failed URLs for potential retry
@@ -315,38 +383,38 @@ class BlockDetector:
         - Must affect multiple domains (not just one problematic site)
         - Must have high blocking rate (≥60% of recent attempts)
         """
-        # Extract blocking failures from recent attempts
-        blocking_failures = [
-            (url, domain)
-            for url, domain, is_blocking, _ in self.recent_attempts
-            if is_blocking
-        ]
-
-        # Not enough blocking failures to trigger
-        if len(blocking_failures) < self.threshold:
+        # Not enough blocking failures to trigger (checked without scanning the window)
+        blocking_count = self.blocking_count
+        if blocking_count < self.threshold:
             return False, {}
 
-        # Check if recent blocking failures span multiple domains
-        recent_blocking = blocking_failures[-self.threshold:]
-        unique_domains = set(domain for _, domain in recent_blocking)
+        # Check if the most recent blocking failures span multiple domains
+        unique_domains = set()
+        needed = self.threshold
+        for _, domain, is_blocking, _ in reversed(self.recent_attempts):
+            if is_blocking:
+                unique_domains.add(domain)
+                needed -= 1
+                if not needed:
+                    break
 
         # Calculate blocking rate within the window
         total_in_window = len(self.recent_attempts)
-        blocking_rate = len(blocking_failures) / max(total_in_window, 1)
+        blocking_rate = blocking_count / max(total_in_window, 1)
 
         # Trigger blocking alert if:
         # 1. Threshold of blocking failures met
         # 2. Multiple domains affected (≥2) - single domain issues don't indicate IP block
         # 3. High blocking rate (≥60%) - prevents false positives in large crawls
         is_blocked = (
-            len(blocking_failures) >= self.threshold and
+            blocking_count >= self.threshold and
             len(unique_domains) >= 2 and
             blocking_rate >= 0.6
         )
 
         # Gather statistics for reporting
         stats = {
-            'blocking_failures': len(blocking_failures),
+            'blocking_failures': blocking_count,
             'total_attempts': total_in_window,
             'blocking_rate': blocking_rate,
             'unique_domains': len(unique_domains),
@@ -363,14 +431,48 @@ class BlockDetector:
     def reset(self):
         """Reset the detector state (called after handling a block)"""
         self.recent_attempts.clear()
+        self.blocking_count = 0
         # Keep retry queue for user to access
 
 
+class CompletedUrls:
+    """Membership set of URLs already recorded in a checkpoint.
+
+    Holds hash(url) (a 64-bit int) instead of the URL strings, roughly halving
+    resident memory for large checkpoints. String hashes are salted per
+    interpreter, so instances are only meaningful within one process - which
+    is all a resume needs; the checkpoint file itself stays plain text.
+    """
+
+    __slots__ = ("_hashes",)
+
+    def __init__(self, urls: Iterable[str] = ()):
+        self._hashes = frozenset(map(hash, urls))
+
+    @classmethod
+    def from_file(cls, path: str) -> "CompletedUrls":
+        """Load a checkpoint file (one URL per line; blank lines ignored)"""
+        with open(path, "r", encoding="utf-8") as f:
+            # Stream line by line so only the hashes, never the whole file, are
+            # held at once
+            return cls(filter(None, map(str.strip, f)))
+
+    def __contains__(self, url: str) -> bool:
+        return hash(url) in self._hashes
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+
 def normalize_url(url: str) -> str:
-    u = urllib.parse.urlsplit(url)
-    if not u.scheme:
-        url = "https://" + url
-    return url
+    # Prefix check for the common http(s) case instead of a full urlsplit
+    if url[:8].lower().startswith(("http://", "https://")):
+        return url
+    if url.startswith("//"):
+        return "https:" + url  # protocol-relative
+    if _SCHEME_RE.match(url):
+        return url  # other scheme: left as-is (the fetch rejects it)
+    return "https://" + url
 
 def generate_url_variations(url: str, max_variations: int = 4) -> List[str]:
     """Generate common URL variations to try on failure.
@@ -388,30 +490,36 @@ def generate_url_variations(url: str, max_variations: int = 4) -> List[str]:
     Returns:
         List of URL variations in priority order (most likely to work first)
     """
+    return list(_url_variations(url, max_variations))
+
+@functools.lru_cache(maxsize=4096)
+def _url_variations(url: str, max_variations: int) -> Tuple[str, ...]:
+    """Memoized body of generate_url_variations (tuple, so cached values stay immutable)."""
+    scheme, netloc, path, query, fragment = _split(url)
+    # Everything after the path, rebuilt the way urlunsplit would
+    tail = (f"?{query}" if query else "") + (f"#{fragment}" if fragment else "")
+
     variations = []
-    parsed = urllib.parse.urlparse(url)
 
     # Variation 1: Add/remove www prefix
-    if parsed.netloc.startswith('www.'):
+    if netloc.startswith('www.'):
         # Try without www
-        new_netloc = parsed.netloc[4:]
-        variations.append(urllib.parse.urlunparse(parsed._replace(netloc=new_netloc)))
+        variations.append(f"{scheme}://{netloc[4:]}{path}{tail}")
     else:
         # Try with www
-        new_netloc = 'www.' + parsed.netloc
-        variations.append(urllib.parse.urlunparse(parsed._replace(netloc=new_netloc)))
+        variations.append(f"{scheme}://www.{netloc}{path}{tail}")
 
     # Variation 2: Switch scheme (https ↔ http)
-    opposite_scheme = 'http' if parsed.scheme == 'https' else 'https'
-    variations.append(urllib.parse.urlunparse(parsed._replace(scheme=opposite_scheme)))
+    opposite_scheme = 'http' if scheme == 'https' else 'https'
+    variations.append(f"{opposite_scheme}://{netloc}{path}{tail}")
 
     # Variation 3: Add trailing slash (if not present)
-    if not parsed.path.endswith('/'):
-        variations.append(urllib.parse.urlunparse(parsed._replace(path=parsed.path + '/')))
+    if not path.endswith('/'):
+        variations.append(f"{scheme}://{netloc}{path}/{tail}")
 
     # Variation 4: Remove trailing slash (if present and not root)
-    if parsed.path.endswith('/') and parsed.path != '/':
-        variations.append(urllib.parse.urlunparse(parsed._replace(path=parsed.path.rstrip('/'))))
+    if path.endswith('/') and path != '/':
+        variations.append(f"{scheme}://{netloc}{path.rstrip('/')}{tail}")
 
     # Remove duplicates while preserving order
     seen = set()
@@ -421,24 +529,80 @@ def generate_url_variations(url: str, max_variations: int = 4) -> List[str]:
             seen.add(v)
             unique_variations.append(v)
 
-    return unique_variations[:max_variations]
+    return tuple(unique_variations[:max_variations])
 
-def extract_resource_urls(html: str, base_url: str) -> List[str]:
-    """Extract resource URLs from HTML - scripts, stylesheets, iframes only.
-    Excludes <a> tags to avoid navigation link noise."""
-    soup = BeautifulSoup(html, "lxml")
-    urls: Set[str] = set()
+def _resource_urls_from_doc(doc: "lxml.html.HtmlElement", base_url: str) -> List[str]:
+    """Resource URLs (script src, link href, iframe src) from a parsed document.
+
+    Deduplicated in document order (a dict, not a set, so the order - and the
+    network evidence built from it - is the same on every run).
+    """
+    urls: Dict[str, None] = {}
     # Only extract actual resources, not navigation links
-    for tag, attr in (("script","src"),("link","href"),("iframe","src")):
-        for el in soup.find_all(tag):
-            href = el.get(attr)
+    for href in doc.xpath(".//script/@src | .//link/@href | .//iframe/@src"):
+        if not href: continue
+        try:
+            urls[urllib.parse.urljoin(base_url, href)] = None
+        except Exception:
+            continue
+    return list(urls)
+
+
+def _extract_with_lexbor(html: str, base_url: str, want_resources: bool) -> Tuple[dict, List[str]]:
+    """selectolax/Lexbor version of _parse_and_extract (same results, faster parse)."""
+    tree = LexborHTMLParser(html)
+
+    title = None
+    title_tag = tree.css_first("title")
+    if title_tag is not None:
+        title = title_tag.text().strip() or None  # Convert empty string to None
+
+    description = None
+    meta_desc = tree.css_first('meta[name="description"]')
+    if meta_desc is not None:
+        description = (meta_desc.attributes.get("content") or "").strip() or None
+
+    urls: Dict[str, None] = {}
+    if want_resources:
+        # Only extract actual resources, not navigation links (document order)
+        for node in tree.css("script[src], link[href], iframe[src]"):
+            href = node.attributes.get("href" if node.tag == "link" else "src")
             if not href: continue
             try:
-                absu = urllib.parse.urljoin(base_url, href)
-                urls.add(absu)
+                urls[urllib.parse.urljoin(base_url, href)] = None
             except Exception:
                 continue
-    return list(urls)
+
+    return {"title": title, "description": description}, list(urls)
+
+
+def _parse_and_extract(html: str, base_url: str, want_resources: bool) -> Tuple[dict, List[str]]:
+    """Parse once and return (page metadata, resource URLs).
+
+    Uses selectolax when installed, lxml otherwise. Runs off the event loop
+    in process_url; both parsers work in C, so several pages can be parsed
+    in parallel worker threads. Bodies with no tags at all (empty or
+    plain-text error responses) are answered without parsing.
+    """
+    if "<" not in html:
+        return _metadata_from_doc(None), []
+    if _HAS_SELECTOLAX:
+        try:
+            return _extract_with_lexbor(html, base_url, want_resources)
+        except Exception:
+            pass  # Let lxml have a go
+    try:
+        doc = _parse_html(html)
+    except Exception:
+        return _metadata_from_doc(None), []
+    resources = _resource_urls_from_doc(doc, base_url) if want_resources else []
+    return _metadata_from_doc(doc), resources
+
+
+def extract_resource_urls(html: str, base_url: str) -> List[str]:
+    """Extract resource URLs from HTML - scripts, stylesheets, iframes only.
+    Excludes <a> tags to avoid navigation link noise."""
+    return _parse_and_extract(html, base_url, True)[1]
 
 
 async def handle_pause_prompt(pause_event: asyncio.Event, block_detector: BlockDetector,
@@ -460,19 +624,7 @@ async def handle_pause_prompt(pause_event: asyncio.Event, block_detector: BlockD
         return
 
     def prompt_with_timeout():
-        """Blocking input with timeout (runs in thread pool)"""
-        print("\n" + "="*60, file=sys.stderr)
-        print("🛑 CRAWL PAUSED - Blocking detected", file=sys.stderr)
-        print("="*60, file=sys.stderr)
-        print("\nOptions:", file=sys.stderr)
-        print("  [c] Continue crawling from current position", file=sys.stderr)
-        print("  [q] Quit gracefully (checkpoint saved)", file=sys.stderr)
-
-        if auto_resume_secs > 0:
-            print(f"\n⏰ Auto-resume in {auto_resume_secs}s if no input...\n", file=sys.stderr)
-
-        print("Your choice [c/q]: ", file=sys.stderr, end='', flush=True)
-
+        """Blocking input with timeout (runs in a worker thread)"""
         try:
             if auto_resume_secs > 0:
                 # Check if stdin has data with timeout
@@ -493,9 +645,23 @@ async def handle_pause_prompt(pause_event: asyncio.Event, block_detector: BlockD
             print(f"\n⚠️  Input error ({e}), auto-resuming", file=sys.stderr)
             return 'c'
 
-    # Run blocking input in thread pool to avoid blocking event loop
-    loop = asyncio.get_event_loop()
-    choice = await loop.run_in_executor(None, prompt_with_timeout)
+    # Banner is printed here; only the blocking read runs in the thread
+    banner = [
+        "\n" + "="*60,
+        "🛑 CRAWL PAUSED - Blocking detected",
+        "="*60,
+        "\nOptions:",
+        "  [c] Continue crawling from current position",
+        "  [q] Quit gracefully (checkpoint saved)",
+    ]
+    if auto_resume_secs > 0:
+        banner.append(f"\n⏰ Auto-resume in {auto_resume_secs}s if no input...\n")
+    banner.append("Your choice [c/q]: ")
+    sys.stderr.write("\n".join(banner))
+    sys.stderr.flush()
+
+    # Run blocking input in a thread to avoid blocking the event loop
+    choice = await asyncio.to_thread(prompt_with_timeout)
 
     if choice == 'q':
         print("\n✅ Quitting gracefully (checkpoint saved)...", file=sys.stderr)
@@ -580,6 +746,38 @@ async def block_detection_coordinator(detector_queue: asyncio.Queue, pause_event
             pause_event.set()
 
 
+class FetchError(RuntimeError):
+    """A fetch that failed without a usable HTTP response.
+
+    4xx/5xx responses are returned by fetch_html, not raised, so this only
+    covers transport-level failures and never carries an HTTP status.
+
+    Attributes:
+        url: The URL being fetched
+        transient: Whether retrying might succeed (timeouts, resets, DNS)
+    """
+
+    def __init__(self, url: str, message: str, transient: bool = True):
+        super().__init__(f"HTTP error fetching {url}: {message}")
+        self.url = url
+        self.transient = transient
+
+
+def make_client(concurrency: int = 2, user_agent: str = DEFAULT_UA, insecure: bool = False) -> httpx.AsyncClient:
+    """Build the HTTP client run() uses, for callers driving process_url directly.
+
+    One client should be shared by every fetch: HTTP/2 lets requests to the
+    same host multiplex over one connection, and concurrency caps the open
+    connections. Keep-alive pooling stays off (the v1.7.0 fix for CLOSE_WAIT
+    build-up), and connections are IPv4 only.
+    """
+    # DEADLOCK FIX: Disable connection pooling to prevent CLOSE_WAIT accumulation
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=0)
+    # Bind to 0.0.0.0 so connections are IPv4 only: skips AAAA/IPv6
+    # connect attempts that stall on hosts with broken IPv6
+    transport = httpx.AsyncHTTPTransport(http2=True, limits=limits, verify=not insecure, local_address="0.0.0.0")
+    return httpx.AsyncClient(headers={"user-agent": user_agent}, transport=transport)
+
 async def fetch_html(client: httpx.AsyncClient, url: str) -> Tuple[str, Dict[str, str], int, str]:
     """Fetch HTML with error handling. Returns (html, headers, status_code, final_url)"""
     try:
@@ -595,17 +793,32 @@ async def fetch_html(client: httpx.AsyncClient, url: str) -> Tuple[str, Dict[str
         final_url = str(e.response.url) if e.response else url
         return e.response.text if e.response else "", headers, status_code, final_url
     except (httpx.RequestError, httpx.TimeoutException) as e:
-        # Network errors, DNS failures, timeouts
-        raise RuntimeError(f"HTTP error fetching {url}: {str(e)}") from e
+        # Network errors, DNS failures, timeouts are worth retrying; bad
+        # schemes, redirect loops and decoding errors are not
+        transient = isinstance(e, httpx.TransportError) and not isinstance(e, httpx.UnsupportedProtocol)
+        raise FetchError(url, str(e), transient=transient) from e
+
+async def render_with_playwright(url: str, user_agent: str, browser: Any = None) -> Tuple[str, List[str], Dict[str,str], int, str]:
+    """Render url in headless Chromium. Returns (html, network_urls, headers, status_code, final_url).
 
-async def render_with_playwright(url: str, user_agent: str) -> Tuple[str, List[str], Dict[str,str], int, str]:
+    Pass a running browser to reuse it (run() shares one across all URLs);
+    only a fresh context and page are created per URL. Without one, a
+    browser is launched and closed for this URL alone.
+    """
     if not _HAS_PLAYWRIGHT:
         raise RuntimeError("playwright not installed. pip install playwright && playwright install chromium")
-    network: List[str] = []
 
-    async with async_playwright() as pw:
-        browser = await pw.chromium.launch(headless=True)
-        ctx = await browser.new_context(user_agent=user_agent, ignore_https_errors=True)
+    if browser is None:
+        async with async_playwright() as pw:
+            own_browser = await pw.chromium.launch(headless=True)
+            try:
+                return await render_with_playwright(url, user_agent, own_browser)
+            finally:
+                await own_browser.close()
+
+    network: List[str] = []
+    ctx = await browser.new_context(user_agent=user_agent, ignore_https_errors=True)
+    try:
         page = await ctx.new_page()
         page.on("request", lambda req: network.append(req.url))
         resp = await page.goto(url, wait_until="load", timeout=30000)
@@ -619,11 +832,11 @@ async def render_with_playwright(url: str, user_agent: str) -> Tuple[str, List[s
             final_url = page.url  # Get final URL after redirects
         # wait a bit for late beacons
         await page.wait_for_timeout(1500)
+    finally:
         await ctx.close()
-        await browser.close()
     return html, network, headers, status_code, final_url
 
-async def process_url(original_url: str, url: str, client: httpx.AsyncClient, render: bool, validate: bool) -> dict:
+async def process_url(original_url: str, url: str, client: httpx.AsyncClient, render: bool, validate: bool, executor: Optional[Executor] = None, browser: Any = None) -> dict:
     """Process a URL and return detection results. Raises on fatal errors.
 
     Args:
@@ -632,29 +845,39 @@ async def process_url(original_url: str, url: str, client: httpx.AsyncClient, re
         client: httpx client
         render: Whether to use Playwright rendering
         validate: Whether to validate against schema
+        executor: Executor for HTML parsing (None = the loop's default executor)
+        browser: Shared Playwright browser for rendering (None = launch one per URL)
     """
     html = ""
     headers: Dict[str,str] = {}
     status_code = 0
     final_url = url  # Default to normalized URL
     network_lines: List[str] = []
+    rendered = False
 
     try:
         if render and _HAS_PLAYWRIGHT:
             try:
-                html, network_lines, headers, status_code, final_url = await render_with_playwright(url, client.headers.get("user-agent", DEFAULT_UA))
+                html, network_lines, headers, status_code, final_url = await render_with_playwright(url, client.headers.get("user-agent", DEFAULT_UA), browser)
+                rendered = True
             except Exception as e:
                 # Fall back to static if render fails
                 print(f"Playwright render failed for {url}, falling back to static: {e}", file=sys.stderr)
                 html, headers, status_code, final_url = await fetch_html(client, url)
-                network_lines = extract_resource_urls(html, url)
         else:
             html, headers, status_code, final_url = await fetch_html(client, url)
-            network_lines = extract_resource_urls(html, url)
     except Exception as e:
         # Fatal HTTP/network error - re-raise with context
         raise RuntimeError(f"Failed to fetch {url}: {str(e)}") from e
 
+    # Parse once, off the event loop; the tree feeds both resource extraction
+    # and metadata
+    page_metadata, resource_urls = await asyncio.get_running_loop().run_in_executor(
+        executor, _parse_and_extract, html, url, not rendered
+    )
+    if not rendered:
+        network_lines = resource_urls
+
     # For HTTP error responses (4xx/5xx), set final_url = original_url
     # since we didn't get usable content to analyze
     if status_code >= 400:
@@ -667,27 +890,21 @@ async def process_url(original_url: str, url: str, client: httpx.AsyncClient, re
     # Deduplicate evidence based on (category, patternId, source, truncated match)
     seen = set()
     deduped_ev = []
+    add_seen, append = seen.add, deduped_ev.append
     for e in ev:
-        key = (e["category"], e["patternId"], e["source"], e["match"][:300])
+        m = e["match"]
+        key = (e["category"], e["patternId"], e["source"], m if len(m) <= 300 else m[:300])
         if key not in seen:
-            seen.add(key)
-            deduped_ev.append(e)
+            add_seen(key)
+            append(e)
     ev = deduped_ev
 
-    # Inspect Set-Cookie headers for cookie names
-    # httpx returns headers as a multi-dict, we need to get all Set-Cookie headers
-    if hasattr(headers, 'get_list'):
-        set_cookie_headers = headers.get_list("Set-Cookie") or headers.get_list("set-cookie") or []
-    else:
-        # Fallback for regular dict
-        set_cookie_val = headers.get("set-cookie") or headers.get("Set-Cookie")
-        set_cookie_headers = [set_cookie_val] if set_cookie_val else []
-
-    for cookie_header in set_cookie_headers:
-        if not cookie_header:
-            continue
-        # Check for HubSpot cookie names at the start of each Set-Cookie value
-        for m in re.finditer(RX["cookie_any"], cookie_header):
+    # Inspect Set-Cookie headers for cookie names. headers is always a plain
+    # dict here: httpx's items() (fetch_html) and Playwright both merge repeated
+    # Set-Cookie headers into one value, so a single scan sees every cookie
+    cookie_header = headers.get("set-cookie") or headers.get("Set-Cookie")
+    if cookie_header:
+        for m in _COOKIE_ANY_RE.finditer(cookie_header):
             cookie_name = m.group(0)
             # hubspotutk is definitive tracking evidence
             confidence = "definitive" if cookie_name.lower() == "hubspotutk" else "strong"
@@ -700,123 +917,183 @@ async def process_url(original_url: str, url: str, client: httpx.AsyncClient, re
                 "confidence": confidence
             })
 
-    # Extract page metadata
-    page_metadata = extract_page_metadata(html)
-
     result = make_result(original_url, final_url, ev, headers=headers, http_status=status_code, page_metadata=page_metadata)
 
     if validate and _HAS_JSONSCHEMA:
-        import importlib.resources as pkg_resources
-        from . import schemas as _schemas_pkg
-        schema_text = pkg_resources.files(_schemas_pkg).joinpath("hubspot_detection_result.schema.json").read_text()
-        schema = json.loads(schema_text)
-        jsonschema.validate(instance=result, schema=schema)
+        _get_validator().validate(result)
 
     return result
 
+@functools.lru_cache(maxsize=1)
+def _get_validator():
+    """Load the result schema and build its validator once per process."""
+    import importlib.resources as pkg_resources
+    from . import schemas as _schemas_pkg
+    schema_text = pkg_resources.files(_schemas_pkg).joinpath("hubspot_detection_result.schema.json").read_text()
+    schema = json.loads(schema_text)
+    cls = jsonschema.validators.validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
+
+# CSV/Excel column order (19 columns total)
+CSV_FIELDNAMES = (
+    "original_url", "final_url", "timestamp", "hubspot_detected", "tracking", "cms_hosting", "confidence",
+    "forms", "chat", "ctas_legacy", "meetings", "video", "email_tracking",
+    "hub_ids", "hub_id_count", "evidence_count", "http_status", "page_title", "page_description"
+)
+
+def flatten_result_row(result: dict) -> list:
+    """
+    Flatten a nested detection result dict into a row of values in CSV_FIELDNAMES order.
+
+    Used directly by the CSV and Excel writers (no per-row dict to look up).
+    """
+    r_get = result.get
+    summary = r_get("summary", {})
+    s_get = summary.get
+    f_get = summary.get("features", {}).get
+    page_metadata = r_get("page_metadata", {})
+
+    # Format hub IDs as comma-separated string
+    hub_ids = r_get("hubIds", [])
+    hub_ids_str = ",".join(map(str, hub_ids)) if hub_ids else ""
+
+    return [
+        r_get("original_url", ""),
+        r_get("final_url", ""),
+        r_get("timestamp", ""),
+        r_get("hubspot_detected", False),
+        s_get("tracking", False),
+        s_get("cmsHosting", False),
+        s_get("confidence", ""),
+        f_get("forms", False),
+        f_get("chat", False),
+        f_get("ctasLegacy", False),
+        f_get("meetings", False),
+        f_get("video", False),
+        f_get("emailTrackingIndicators", False),
+        hub_ids_str,
+        len(hub_ids),
+        len(r_get("evidence", [])),
+        r_get("http_status", ""),
+        (page_metadata.get("title") or "") if page_metadata else "",
+        (page_metadata.get("description") or "") if page_metadata else "",
+    ]
+
 def flatten_result_for_csv(result: dict) -> dict:
     """
     Flatten a nested detection result dict into a flat dict suitable for CSV export.
 
     Extracts values from nested summary/features and formats complex types.
     """
-    summary = result.get("summary", {})
-    features = summary.get("features", {})
-    page_metadata = result.get("page_metadata", {})
-
-    # Format hub IDs as comma-separated string
-    hub_ids = result.get("hubIds", [])
-    hub_ids_str = ",".join(str(hid) for hid in hub_ids) if hub_ids else ""
+    return dict(zip(CSV_FIELDNAMES, flatten_result_row(result)))
 
-    return {
-        "original_url": result.get("original_url", ""),
-        "final_url": result.get("final_url", ""),
-        "timestamp": result.get("timestamp", ""),
-        "hubspot_detected": result.get("hubspot_detected", False),
-        "tracking": summary.get("tracking", False),
-        "cms_hosting": summary.get("cmsHosting", False),
-        "confidence": summary.get("confidence", ""),
-        "forms": features.get("forms", False),
-        "chat": features.get("chat", False),
-        "ctas_legacy": features.get("ctasLegacy", False),
-        "meetings": features.get("meetings", False),
-        "video": features.get("video", False),
-        "email_tracking": features.get("emailTrackingIndicators", False),
-        "hub_ids": hub_ids_str,
-        "hub_id_count": len(hub_ids),
-        "evidence_count": len(result.get("evidence", [])),
-        "http_status": result.get("http_status", ""),
-        "page_title": (page_metadata.get("title") or "") if page_metadata else "",
-        "page_description": (page_metadata.get("description") or "") if page_metadata else ""
-    }
+async def csv_writer_worker(queue: asyncio.Queue, output_file: Optional[str],
+                            on_flushed: Optional[Callable[[int], None]] = None):
+    """CSV writer coroutine that writes flattened results to CSV format.
 
-async def csv_writer_worker(queue: asyncio.Queue, output_file: Optional[str]):
-    """CSV writer coroutine that writes flattened results to CSV format."""
+    on_flushed, if given, is called with the number of results that have
+    reached the file (or stdout) since its previous call.
+    """
     import csv
 
-    # CSV field names in order (19 columns total)
-    fieldnames = [
-        "original_url", "final_url", "timestamp", "hubspot_detected", "tracking", "cms_hosting", "confidence",
-        "forms", "chat", "ctas_legacy", "meetings", "video", "email_tracking",
-        "hub_ids", "hub_id_count", "evidence_count", "http_status", "page_title", "page_description"
-    ]
-
     if output_file:
-        f = open(output_file, "w", encoding="utf-8", newline='')
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
+        f = open(output_file, "w", encoding="utf-8", newline='', buffering=1 << 20)
+        writer = csv.writer(f)
     else:
         f = None
-        writer = csv.DictWriter(sys.stdout, fieldnames=fieldnames)
-        writer.writeheader()
-
+        writer = csv.writer(sys.stdout)
+    writer.writerow(CSV_FIELDNAMES)
+
+    def write_rows(rows: List[list], flush: bool) -> None:
+        writer.writerows(rows)
+        if flush:
+            f.flush()  # Bound how much a crash can lose; close() flushes the rest
+
+    wrote = 0
+    notified = 0  # rows reported to on_flushed
+    flushed_at = 0
+    flushed_time = time.monotonic()
+    done = False
     try:
-        while True:
-            item = await queue.get()
-
-            # Poison pill signals shutdown
-            if item is None:
-                break
-
-            # Flatten and write (move to thread to avoid blocking event loop)
-            flat_row = flatten_result_for_csv(item)
-            await asyncio.to_thread(writer.writerow, flat_row)
-            if f:
-                await asyncio.to_thread(f.flush)
-
-            queue.task_done()
+        while not done:
+            if f is not None and wrote > flushed_at:
+                # Rows are waiting in the buffer: don't sit on them past
+                # FLUSH_SECS just because no new result arrives
+                try:
+                    first = await asyncio.wait_for(queue.get(), max(0.0, flushed_time + FLUSH_SECS - time.monotonic()))
+                except asyncio.TimeoutError:
+                    await asyncio.to_thread(f.flush)
+                    flushed_at, flushed_time = wrote, time.monotonic()
+                    if on_flushed:
+                        on_flushed(wrote - notified)
+                        notified = wrote
+                    continue
+            else:
+                first = await queue.get()
+
+            # Take whatever has queued up (at most WRITE_BATCH items)
+            batch = [first]
+            while len(batch) < WRITE_BATCH and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            rows = []
+            for item in batch:
+                # Poison pill signals shutdown
+                if item is None:
+                    done = True
+                    break
+                rows.append(flatten_result_row(item))
+                queue.task_done()
+
+            if not rows:
+                continue
+            wrote += len(rows)
+            now = time.monotonic()
+            flush = f is not None and (wrote - flushed_at >= FLUSH_EVERY or now - flushed_time >= FLUSH_SECS)
+            if flush:
+                flushed_at, flushed_time = wrote, now
+            # One thread hop per batch (write + any due flush) to keep the event loop free
+            await asyncio.to_thread(write_rows, rows, flush)
+            if on_flushed and (flush or f is None):
+                on_flushed(wrote - notified)
+                notified = wrote
     finally:
         if f:
             f.close()
+    if on_flushed and wrote > notified:
+        on_flushed(wrote - notified)
+
+async def excel_writer_worker(queue: asyncio.Queue, output_file: str,
+                              on_flushed: Optional[Callable[[int], None]] = None):
+    """Excel writer coroutine that writes flattened results to .xlsx format.
 
-async def excel_writer_worker(queue: asyncio.Queue, output_file: str):
-    """Excel writer coroutine that writes flattened results to .xlsx format."""
+    Nothing is on disk until the workbook is saved at the end, so on_flushed
+    (if given) is called once, with the row count, after the save.
+    """
     try:
         import openpyxl
         from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
         from openpyxl.styles import Font
     except ImportError:
         raise RuntimeError("openpyxl not installed. Install with: pip install 'hubspot-crawler[excel]' or pip install openpyxl")
 
-    # Create workbook and worksheet
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "HubSpot Detection Results"
-
-    # Field names in order (19 columns total)
-    fieldnames = [
-        "original_url", "final_url", "timestamp", "hubspot_detected", "tracking", "cms_hosting", "confidence",
-        "forms", "chat", "ctas_legacy", "meetings", "video", "email_tracking",
-        "hub_ids", "hub_id_count", "evidence_count", "http_status", "page_title", "page_description"
-    ]
-
-    # Write headers
-    ws.append(fieldnames)
-
-    # Make header row bold
-    for cell in ws[1]:
-        cell.font = Font(bold=True)
-
+    # Write-only workbook: rows stream to a temp file as they are appended
+    # instead of being held in memory as Cell objects until save()
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("HubSpot Detection Results")
+
+    # Write headers (bold)
+    bold = Font(bold=True)
+    header = []
+    for name in CSV_FIELDNAMES:
+        cell = WriteOnlyCell(ws, value=name)
+        cell.font = bold
+        header.append(cell)
+    ws.append(header)
+
+    wrote = 0
     try:
         while True:
             item = await queue.get()
@@ -825,65 +1102,173 @@ async def excel_writer_worker(queue: asyncio.Queue, output_file: str):
             if item is None:
                 break
 
-            # Flatten and convert to row
-            flat_row = flatten_result_for_csv(item)
-            row_values = [flat_row.get(field, "") for field in fieldnames]
-            ws.append(row_values)
+            ws.append(flatten_result_row(item))
+            wrote += 1
 
             queue.task_done()
     finally:
         # Save workbook (move to thread to avoid blocking event loop)
         await asyncio.to_thread(wb.save, output_file)
+    if on_flushed and wrote:
+        on_flushed(wrote)
 
-async def writer_worker(queue: asyncio.Queue, output_file: Optional[str], pretty: bool = False):
+async def writer_worker(queue: asyncio.Queue, output_file: Optional[str], pretty: bool = False,
+                        on_flushed: Optional[Callable[[int], None]] = None):
     """Single writer coroutine that drains queue and writes to file or stdout.
-    Eliminates file write race condition by centralizing all writes."""
+    Eliminates file write race condition by centralizing all writes.
+    Items are result dicts or already-encoded JSON bytes. Whatever has queued
+    up (at most WRITE_BATCH items) is written with a single write() call.
+    on_flushed, if given, is called with the number of items that have
+    reached the file (or stdout) since its previous call."""
 
     if output_file:
-        f = open(output_file, "w", encoding="utf-8")
+        f = open(output_file, "wb")  # _json_bytes already yields UTF-8
     else:
         f = None
 
+    wrote = 0
+    notified = 0  # items reported to on_flushed
+    flushed_at = 0
+    flushed_time = time.monotonic()
+    done = False
     try:
-        while True:
-            item = await queue.get()
-
-            # Poison pill signals shutdown
-            if item is None:
-                break
-
-            # Format and write
-            line = json.dumps(item, indent=2 if pretty else None)
+        while not done:
+            if f and wrote > flushed_at:
+                # Lines are waiting in the buffer: don't sit on them past
+                # FLUSH_SECS just because no new result arrives
+                try:
+                    first = await asyncio.wait_for(queue.get(), max(0.0, flushed_time + FLUSH_SECS - time.monotonic()))
+                except asyncio.TimeoutError:
+                    f.flush()
+                    flushed_at, flushed_time = wrote, time.monotonic()
+                    if on_flushed:
+                        on_flushed(flushed_at - notified)
+                        notified = flushed_at
+                    continue
+            else:
+                first = await queue.get()
+
+            batch = [first]
+            while len(batch) < WRITE_BATCH and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            lines = []
+            for item in batch:
+                # Poison pill signals shutdown
+                if item is None:
+                    done = True
+                    break
+                # Format (items may arrive already encoded)
+                lines.append(item if isinstance(item, bytes) else _json_bytes(item, pretty))
+                queue.task_done()
+
+            if not lines:
+                continue
+            wrote += len(lines)
+            lines.append(b"")  # trailing newline
+            data = b"\n".join(lines)
             if f:
-                f.write(line + "\n")
-                f.flush()  # Ensure data written
+                f.write(data)
+                now = time.monotonic()
+                if wrote - flushed_at >= FLUSH_EVERY or now - flushed_time >= FLUSH_SECS:
+                    f.flush()  # Bound how much a crash can lose; close() flushes the rest
+                    flushed_at, flushed_time = wrote, now
             else:
-                print(line)
-
-            queue.task_done()
+                sys.stdout.write(data.decode("utf-8"))
+                flushed_at = wrote
+            if on_flushed and flushed_at > notified:
+                on_flushed(flushed_at - notified)
+                notified = flushed_at
     finally:
         if f:
             f.close()
+    if on_flushed and wrote > notified:
+        on_flushed(wrote - notified)
 
-async def run(urls: List[str], concurrency: int = 2, render: bool = False, validate: bool = False, user_agent: str = DEFAULT_UA, output: Optional[str] = None, output_format: str = "jsonl", pretty: bool = False, max_retries: int = 3, failures_output: Optional[str] = None, checkpoint_file: Optional[str] = None, try_variations: bool = False, max_variations: int = 4, progress_interval: int = 10, progress_style: str = "compact", quiet: bool = False, delay: float = 3.0, jitter: float = 1.0, max_per_domain: int = 1, block_detection: bool = False, block_threshold: int = 5, block_window: int = 20, block_action: str = "pause", block_auto_resume: int = 300, insecure: bool = False):
-    # DEADLOCK FIX: Disable connection pooling to prevent CLOSE_WAIT accumulation
-    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=0)
+async def stderr_logger(queue: asyncio.Queue, batch_size: int = 64):
+    """Logger coroutine that drains lines from queue to stderr.
 
+    Lines that queue up while a write is in progress are joined and written
+    with one write() and one flush(), up to batch_size at a time. None is the
+    poison pill. Batches are encoded once and written to the binary buffer
+    underneath sys.stderr, falling back to text writes for streams without
+    one (e.g. a StringIO swapped in by an embedding application).
+    """
+    stream = sys.stderr
+    buffer = getattr(stream, "buffer", None)
+    if buffer is not None:
+        encoding = stream.encoding or "utf-8"
+        errors = stream.errors or "backslashreplace"
+        stream.flush()  # anything already written through the text layer goes first
+    while True:
+        line = await queue.get()
+        if line is None:
+            break
+        batch = [line]
+        done = False
+        while len(batch) < batch_size and not queue.empty():
+            line = queue.get_nowait()
+            if line is None:
+                done = True
+                break
+            batch.append(line)
+        batch.append("")  # trailing newline
+        if buffer is not None:
+            buffer.write("\n".join(batch).encode(encoding, errors))
+            buffer.flush()
+        else:
+            stream.write("\n".join(batch))
+            stream.flush()
+        if done:
+            break
+
+async def run(urls: Iterable[str], concurrency: int = 2, render: bool = False, validate: bool = False, user_agent: str = DEFAULT_UA, output: Optional[str] = None, output_format: str = "jsonl", pretty: bool = False, max_retries: int = 3, failures_output: Optional[str] = None, checkpoint_file: Optional[str] = None, try_variations: bool = False, max_variations: int = 4, progress_interval: int = 10, progress_style: str = "compact", quiet: bool = False, delay: float = 3.0, jitter: float = 1.0, max_per_domain: int = 1, block_detection: bool = False, block_threshold: int = 5, block_window: int = 20, block_action: str = "pause", block_auto_resume: int = 300, insecure: bool = False, completed_urls: Optional[Container[str]] = None, total_urls: Optional[int] = None):
+    """Crawl urls and write detection results.
+
+    urls may be any iterable. Lists are counted up front. For a lazy
+    iterator (e.g. iter_urls_from_file) pass total_urls as well, the number
+    of URLs that will actually be crawled, and URLs are pulled only as
+    workers free up. Without total_urls an iterator is materialized to count
+    it.
+
+    completed_urls (e.g. a CompletedUrls checkpoint) is for API callers
+    passing unfiltered URLs: any URL it contains is skipped. The CLI filters
+    while reading its input and does not pass it.
+    """
     # Create queue for results (bounded to prevent memory issues)
     result_queue = asyncio.Queue(maxsize=concurrency * 2)
 
     # Create queue for failures
     failure_queue = asyncio.Queue(maxsize=concurrency * 2) if failures_output else None
 
+    if output_format == "xlsx" and not output:
+        raise ValueError("Excel format (xlsx) requires --out parameter (cannot write to stdout)")
+
+    # Open checkpoint file for appending if requested
+    checkpoint_handle = None
+    checkpoint_flushed = None
+    # Checkpoint URL (None for failures) of each result handed to the writer,
+    # in queue order, until the writer reports the result flushed
+    checkpoint_pending: deque = deque()
+    if checkpoint_file:
+        checkpoint_handle = open(checkpoint_file, "a", encoding="utf-8")
+
+        def checkpoint_flushed(n: int) -> None:
+            """Checkpoint the next n results once the writer has flushed them,
+            so a resume never skips a URL whose result was lost in a crash."""
+            for _ in range(n):
+                u = checkpoint_pending.popleft()
+                if u is not None:
+                    checkpoint_handle.write(u + "\n")
+            checkpoint_handle.flush()
+
     # Start single writer task (choose format based on output_format parameter)
     if output_format == "csv":
-        writer_task = asyncio.create_task(csv_writer_worker(result_queue, output))
+        writer_task = asyncio.create_task(csv_writer_worker(result_queue, output, checkpoint_flushed))
     elif output_format == "xlsx":
-        if not output:
-            raise ValueError("Excel format (xlsx) requires --out parameter (cannot write to stdout)")
-        writer_task = asyncio.create_task(excel_writer_worker(result_queue, output))
+        writer_task = asyncio.create_task(excel_writer_worker(result_queue, output, checkpoint_flushed))
     else:
-        writer_task = asyncio.create_task(writer_worker(result_queue, output, pretty))
+        writer_task = asyncio.create_task(writer_worker(result_queue, output, pretty, checkpoint_flushed))
 
     # Start failure writer task if requested
     failure_writer_task = None
@@ -926,30 +1311,33 @@ async def run(urls: List[str], concurrency: int = 2, render: bool = False, valid
         if not quiet:
             print(f"🛡️  Block detection enabled (threshold={block_threshold}, window={block_window}, action={block_action})", file=sys.stderr)
 
+    # Skip URLs already recorded in a checkpoint
+    if completed_urls:
+        urls = filterfalse(completed_urls.__contains__, urls)
+
     # Progress tracking with ProgressTracker
-    total_urls = len(urls)
+    if total_urls is None:
+        if not isinstance(urls, Sized):
+            urls = list(urls)
+        total_urls = len(urls)
     tracker = ProgressTracker(total_urls)
-    progress_lock = asyncio.Lock()
-
-    # Open checkpoint file for appending if requested
-    checkpoint_handle = None
-    if checkpoint_file:
-        checkpoint_handle = open(checkpoint_file, "a", encoding="utf-8")
 
     # Per-domain rate limiting to prevent IP blocking
     # Track semaphores for each domain to limit concurrent requests per domain
     domain_semaphores: Dict[str, asyncio.Semaphore] = {}
-    domain_sem_lock = asyncio.Lock()
 
-    async def get_domain_semaphore(url: str) -> asyncio.Semaphore:
-        """Get or create a semaphore for the domain to limit per-domain concurrency."""
-        parsed = urllib.parse.urlparse(url)
-        domain = parsed.netloc
+    def get_domain_semaphore(url: str) -> asyncio.Semaphore:
+        """Get or create a semaphore for the domain to limit per-domain concurrency.
 
-        async with domain_sem_lock:
-            if domain not in domain_semaphores:
-                domain_semaphores[domain] = asyncio.Semaphore(max_per_domain)
-            return domain_semaphores[domain]
+        A plain function: nothing here awaits, so no lock is needed and
+        callers skip a coroutine per attempt. setdefault keeps the first
+        semaphore should two lookups ever race.
+        """
+        domain = _split(url).netloc
+        sem = domain_semaphores.get(domain)
+        if sem is None:
+            sem = domain_semaphores.setdefault(domain, asyncio.Semaphore(max_per_domain))
+        return sem
 
     async def apply_request_delay():
         """Apply configured delay with jitter between requests to avoid bot detection."""
@@ -964,10 +1352,39 @@ async def run(urls: List[str], concurrency: int = 2, render: bool = False, valid
     if insecure and not quiet:
         print("⚠️  WARNING: TLS certificate verification disabled!", file=sys.stderr)
 
+    # Worker log lines go through one logger task that coalesces bursts into
+    # a single stderr write
+    log_queue: asyncio.Queue = asyncio.Queue()
+    log = log_queue.put_nowait
+    logger_task = asyncio.create_task(stderr_logger(log_queue))
+
+    async def stop_logger():
+        """Flush queued log lines and stop the logger (idempotent)."""
+        if not logger_task.done():
+            log_queue.put_nowait(None)
+            await logger_task
+
+    # Worker threads for HTML parsing, so large pages don't stall the event loop
+    parse_pool = ThreadPoolExecutor(max_workers=min(concurrency, os.cpu_count() or 1),
+                                    thread_name_prefix="hubspot-parse")
+
+    # One headless browser for the whole run when rendering; each URL only
+    # opens its own context
+    playwright = None
+    browser = None
+
     try:
-        async with httpx.AsyncClient(http2=True, headers={"user-agent": user_agent}, limits=limits, verify=not insecure) as client:
-            sem = asyncio.Semaphore(concurrency)
+        if render and _HAS_PLAYWRIGHT:
+            try:
+                playwright = await async_playwright().start()
+                browser = await playwright.chromium.launch(headless=True)
+            except Exception as e:
+                # No shared browser: each URL tries its own launch and falls
+                # back to a static fetch if that fails too
+                print(f"⚠️  WARNING: Could not start shared Playwright browser: {e}", file=sys.stderr)
+                browser = None
 
+        async with make_client(concurrency, user_agent, insecure) as client:
             async def try_url_with_retries(url_to_try: str, original_url: str) -> Tuple[Optional[dict], Optional[int], Optional[Exception]]:
                 """Try a URL with retry logic. Returns (result, status_code, exception).
 
@@ -982,7 +1399,7 @@ async def run(urls: List[str], concurrency: int = 2, render: bool = False, valid
                 last_status_code = None
 
                 # Get domain semaphore to limit concurrent requests per domain
-                domain_sem = await get_domain_semaphore(url_to_try)
+                domain_sem = get_domain_semaphore(url_to_try)
 
                 # Retry loop with exponential backoff
                 for attempt in range(max_retries):
@@ -990,7 +1407,7 @@ async def run(urls: List[str], concurrency: int = 2, render: bool = False, valid
                     try:
                         await asyncio.wait_for(pause_event.wait(), timeout=300)
                     except asyncio.TimeoutError:
-                        print(f"⚠️  Retry loop timeout on pause - auto-resuming to prevent deadlock", file=sys.stderr)
+                        log(f"⚠️  Retry loop timeout on pause - auto-resuming to prevent deadlock")
                         pause_event.set()
 
                     try:
@@ -1002,7 +1419,7 @@ async def run(urls: List[str], concurrency: int = 2, render: bool = False, valid
                             # DEADLOCK FIX: Hard 30s timeout to prevent infinite hangs
                             # httpx timeout doesn't catch CLOSE_WAIT connections
                             res = await asyncio.wait_for(
-                                process_url(original_url, url_to_try, client, render, validate),
+                                process_url(original_url, url_to_try, client, render, validate, parse_pool, browser),
                                 timeout=30.0
                             )
                             # Success - return result with status code from result
@@ -1012,30 +1429,41 @@ async def run(urls: List[str], concurrency: int = 2, render: bool = False, valid
                     except Exception as e:
                         last_exception = e
 
-                        # Extract HTTP status code from error message if present
-                        error_msg = str(e).lower()
+                        # Fetch failures are typed (process_url chains them as
+                        # __cause__) and have no HTTP status; anything else,
+                        # e.g. a render error, falls back to inspecting the message
+                        fetch_err = e if isinstance(e, FetchError) else e.__cause__
+                        if isinstance(fetch_err, FetchError):
+                            status = None
+                            is_transient = fetch_err.transient
+                        else:
+                            error_msg = str(e)
+                            if _RATE_LIMITED_ERR_RE.search(error_msg):
+                                status = 429
+                            elif _FORBIDDEN_ERR_RE.search(error_msg):
+                                status = 403
+                            else:
+                                status = None
+                            is_transient = _TRANSIENT_ERR_RE.search(error_msg) is not None
 
                         # Check for HTTP status codes that indicate blocking or rate limiting
-                        if '429' in error_msg or 'too many requests' in error_msg:
+                        if status == 429:
                             # Rate limited - back off significantly and don't retry
-                            print(f"Rate limited (429) on {url_to_try} - backing off 120s, skipping retries", file=sys.stderr)
+                            log(f"Rate limited (429) on {url_to_try} - backing off 120s, skipping retries")
                             await asyncio.sleep(120)
                             last_status_code = 429
                             break  # Don't retry on rate limiting
 
-                        if '403' in error_msg or 'forbidden' in error_msg:
+                        if status == 403:
                             # Blocked/forbidden - don't retry
-                            print(f"Forbidden (403) on {url_to_try} - likely blocked, skipping retries", file=sys.stderr)
+                            log(f"Forbidden (403) on {url_to_try} - likely blocked, skipping retries")
                             last_status_code = 403
                             break  # Don't retry on blocks
 
-                        # Check for transient errors that should be retried
-                        is_transient = any(x in error_msg for x in ['timeout', 'connection', 'network', 'dns', '5'])
-
                         if attempt < max_retries - 1 and is_transient:
                             # Conservative exponential backoff: 5s, 15s, 45s (was 1s, 2s, 4s)
                             backoff = 5 * (3 ** attempt)
-                            print(f"Retry {attempt + 1}/{max_retries} for {url_to_try} after {backoff}s (error: {e})", file=sys.stderr)
+                            log(f"Retry {attempt + 1}/{max_retries} for {url_to_try} after {backoff}s (error: {e})")
                             await asyncio.sleep(backoff)
                         else:
                             # Final attempt failed or non-transient error
@@ -1044,6 +1472,54 @@ async def run(urls: List[str], concurrency: int = 2, render: bool = False, valid
                 # All retries failed - return None result with failure info
                 return None, last_status_code, last_exception
 
+            # Progress line formatter, chosen once (None when quiet)
+            if quiet:
+                status_fn = None
+            elif progress_style == "detailed":
+                status_fn = tracker.get_detailed_status
+            elif progress_style == "json":
+                status_fn = tracker.get_json_status
+            else:  # compact
+                status_fn = tracker.get_compact_status
+
+            # Completion count at which the next progress line is due
+            next_progress_at = progress_interval
+
+            async def put_result(result: dict, checkpoint_url: Optional[str] = None) -> None:
+                """Queue a result for the writer; checkpoint_url (successes only)
+                is checkpointed once the writer has flushed the result."""
+                check_writer_health()  # Fail fast if writer died
+                await result_queue.put(result)
+                if checkpoint_handle:
+                    # No await since the put, so entries stay in queue order
+                    checkpoint_pending.append(checkpoint_url)
+
+            def record_completion(u: str, result: Optional[dict]) -> None:
+                """Count a finished URL (result None = failed) and print progress.
+
+                Never awaits, so concurrent workers cannot interleave and no lock
+                is needed.
+                """
+                nonlocal next_progress_at
+                tracker.completed += 1
+                if result is not None:
+                    tracker.success_count += 1
+                    tracker.update_from_result(result)
+                else:
+                    tracker.failure_count += 1
+
+                # Progress tick every progress_interval completions and at the end
+                if tracker.completed >= next_progress_at:
+                    next_progress_at += progress_interval
+                elif tracker.completed != total_urls:
+                    return
+
+                if status_fn:
+                    log(status_fn())
+
+            # Failure message for the variations case (only the count varies)
+            variations_err_msg = ERR_MSG_RETRIES + " and {} URL variations"
+
             async def worker(u: str):
                 """Worker that processes a single URL with retry logic and optional URL variations
 
@@ -1051,164 +1527,147 @@ async def run(urls: List[str], concurrency: int = 2, render: bool = False, valid
                     u: The raw input URL from the file (before any normalization)
                 """
 
-                async with sem:
-                    # Wait if paused (block detection) with timeout protection
-                    try:
-                        await asyncio.wait_for(pause_event.wait(), timeout=300)
-                    except asyncio.TimeoutError:
-                        # Just log timeout, don't mutate pause_event (let coordinator handle resume)
-                        print(f"⚠️  Worker timeout on pause after 300s - coordinator should handle resume", file=sys.stderr)
-
-                    # Normalize URL for fetching, but preserve original for tracking
-                    normalized = normalize_url(u)
-
-                    # Try normalized URL first, passing original u for result tracking
-                    result, status_code, exception = await try_url_with_retries(normalized, u)
-
-                    # Report attempt to block detector if enabled
-                    if detector_queue:
-                        await detector_queue.put({
-                            'url': normalized,
-                            'success': result is not None,
-                            'status_code': status_code,
-                            'exception': exception
-                        })
-
-                    if result is not None:
-                        # Original URL succeeded
-                        check_writer_health()  # Fail fast if writer died
-                        await result_queue.put(result)
-
-                        # Update progress and write to checkpoint
-                        async with progress_lock:
-                            tracker.completed += 1
-                            tracker.success_count += 1
-                            tracker.update_from_result(result)
-
-                            if not quiet and (tracker.completed % progress_interval == 0 or tracker.completed == total_urls):
-                                # Print progress based on selected style
-                                if progress_style == "detailed":
-                                    print(tracker.get_detailed_status(), file=sys.stderr)
-                                elif progress_style == "json":
-                                    print(tracker.get_json_status(), file=sys.stderr)
-                                else:  # compact
-                                    print(tracker.get_compact_status(), file=sys.stderr)
-
-                            # Write URL to checkpoint file (move to thread to avoid blocking event loop)
-                            if checkpoint_handle:
-                                await asyncio.to_thread(checkpoint_handle.write, u + "\n")
-                                await asyncio.to_thread(checkpoint_handle.flush)
-
-                        return  # Success
-
-                    # Normalized URL failed - try variations if enabled
-                    if try_variations:
-                        variations = generate_url_variations(normalized, max_variations)
-
-                        if variations:
-                            print(f"Normalized URL failed, trying {len(variations)} variation(s) for {u}", file=sys.stderr)
-
-                        for variation_url in variations:
-                            # Wait if paused before trying variation (with timeout protection)
-                            try:
-                                await asyncio.wait_for(pause_event.wait(), timeout=300)
-                            except asyncio.TimeoutError:
-                                # Just log timeout, don't mutate pause_event (let coordinator handle resume)
-                                print(f"⚠️  Variation worker timeout on pause after 300s - coordinator should handle resume", file=sys.stderr)
-
-                            result, var_status_code, var_exception = await try_url_with_retries(variation_url, u)
-
-                            # Report variation attempt to block detector
-                            if detector_queue:
-                                await detector_queue.put({
-                                    'url': variation_url,
-                                    'success': result is not None,
-                                    'status_code': var_status_code,
-                                    'exception': var_exception
-                                })
-
-                            if result is not None:
-                                # Variation succeeded
-                                print(f"Success with variation: {variation_url} (original: {u})", file=sys.stderr)
-                                check_writer_health()  # Fail fast if writer died
-                                await result_queue.put(result)
-
-                                # Update progress and write to checkpoint
-                                async with progress_lock:
-                                    tracker.completed += 1
-                                    tracker.success_count += 1
-                                    tracker.update_from_result(result)
-
-                                    if not quiet and (tracker.completed % progress_interval == 0 or tracker.completed == total_urls):
-                                        # Print progress based on selected style
-                                        if progress_style == "detailed":
-                                            print(tracker.get_detailed_status(), file=sys.stderr)
-                                        elif progress_style == "json":
-                                            print(tracker.get_json_status(), file=sys.stderr)
-                                        else:  # compact
-                                            print(tracker.get_compact_status(), file=sys.stderr)
-
-                                    # Write original URL to checkpoint (not variation - move to thread)
-                                    if checkpoint_handle:
-                                        await asyncio.to_thread(checkpoint_handle.write, u + "\n")
-                                        await asyncio.to_thread(checkpoint_handle.flush)
-
-                                return  # Success with variation
-
-                    # All attempts (original + variations) failed
-                    async with progress_lock:
-                        tracker.completed += 1
-                        tracker.failure_count += 1
-
-                        if not quiet and (tracker.completed % progress_interval == 0 or tracker.completed == total_urls):
-                            # Print progress based on selected style
-                            if progress_style == "detailed":
-                                print(tracker.get_detailed_status(), file=sys.stderr)
-                            elif progress_style == "json":
-                                print(tracker.get_json_status(), file=sys.stderr)
-                            else:  # compact
-                                print(tracker.get_compact_status(), file=sys.stderr)
-
-                    # Log error and put error result on both queues
-                    attempted_urls = [normalize_url(u)]
-                    if try_variations:
-                        attempted_urls.extend(generate_url_variations(normalize_url(u), max_variations))
-
-                    # Create failure result with same schema as success results
-                    err = {
-                        "original_url": u,                    # Raw input URL
-                        "final_url": u,                       # Same as original (no successful fetch)
-                        "timestamp": datetime.utcnow().isoformat() + "Z",
-                        "hubspot_detected": False,            # No detection occurred
-                        "hubIds": [],                         # No Hub IDs found
-                        "summary": {                          # Empty summary
-                            "tracking": False,
-                            "cmsHosting": False,
-                            "features": {
-                                "forms": False,
-                                "chat": False,
-                                "ctasLegacy": False,
-                                "meetings": False,
-                                "video": False,
-                                "emailTrackingIndicators": False
-                            },
-                            "confidence": "weak"
+                # Wait if paused (block detection) with timeout protection
+                try:
+                    await asyncio.wait_for(pause_event.wait(), timeout=300)
+                except asyncio.TimeoutError:
+                    # Just log timeout, don't mutate pause_event (let coordinator handle resume)
+                    log(f"⚠️  Worker timeout on pause after 300s - coordinator should handle resume")
+
+                # Normalize URL for fetching, but preserve original for tracking
+                normalized = normalize_url(u)
+
+                # Try normalized URL first, passing original u for result tracking
+                result, status_code, exception = await try_url_with_retries(normalized, u)
+
+                # Report attempt to block detector if enabled
+                if detector_queue:
+                    await detector_queue.put({
+                        'url': normalized,
+                        'success': result is not None,
+                        'status_code': status_code,
+                        'exception': exception
+                    })
+
+                if result is not None:
+                    # Original URL succeeded
+                    await put_result(result, u)
+
+                    # Update progress
+                    record_completion(u, result)
+                    return  # Success
+
+                # Normalized URL failed - try variations if enabled
+                variations: List[str] = []
+                if try_variations:
+                    variations = generate_url_variations(normalized, max_variations)
+
+                    if variations:
+                        log(f"Normalized URL failed, trying {len(variations)} variation(s) for {u}")
+
+                    for variation_url in variations:
+                        # Wait if paused before trying variation (with timeout protection)
+                        try:
+                            await asyncio.wait_for(pause_event.wait(), timeout=300)
+                        except asyncio.TimeoutError:
+                            # Just log timeout, don't mutate pause_event (let coordinator handle resume)
+                            log(f"⚠️  Variation worker timeout on pause after 300s - coordinator should handle resume")
+
+                        result, var_status_code, var_exception = await try_url_with_retries(variation_url, u)
+
+                        # Report variation attempt to block detector
+                        if detector_queue:
+                            await detector_queue.put({
+                                'url': variation_url,
+                                'success': result is not None,
+                                'status_code': var_status_code,
+                                'exception': var_exception
+                            })
+
+                        if result is not None:
+                            # Variation succeeded
+                            log(f"Success with variation: {variation_url} (original: {u})")
+                            # Checkpoint the original URL (not the variation)
+                            await put_result(result, u)
+
+                            # Update progress
+                            record_completion(u, result)
+                            return  # Success with variation
+
+                # All attempts (original + variations) failed
+                record_completion(u, None)
+
+                # Log error and put error result on both queues (reusing the
+                # normalized URL and variations tried above)
+                attempted_urls = [normalized, *variations]
+
+                # Create failure result with same schema as success results
+                err = {
+                    "original_url": u,                    # Raw input URL
+                    "final_url": u,                       # Same as original (no successful fetch)
+                    "timestamp": _iso_now(),
+                    "hubspot_detected": False,            # No detection occurred
+                    "hubIds": [],                         # No Hub IDs found
+                    "summary": {                          # Empty summary
+                        "tracking": False,
+                        "cmsHosting": False,
+                        "features": {
+                            "forms": False,
+                            "chat": False,
+                            "ctasLegacy": False,
+                            "meetings": False,
+                            "video": False,
+                            "emailTrackingIndicators": False
                         },
-                        "evidence": [],                       # No evidence
-                        "headers": {},                        # No headers
-                        "error": "Failed after all retry attempts" + (f" and {len(attempted_urls) - 1} URL variations" if try_variations else ""),
-                        "attempts": max_retries,
-                        "attempted_urls": attempted_urls
-                    }
-                    print(f"Failed after all attempts: {u} (tried {len(attempted_urls)} URL(s))", file=sys.stderr)
-                    await result_queue.put(err)
-
-                    if failure_queue:
-                        check_writer_health()  # Fail fast if writer died
-                        await failure_queue.put(err)
-
-            # Process all URLs
-            await asyncio.gather(*(worker(u) for u in urls))
+                        "confidence": "weak"
+                    },
+                    "evidence": [],                       # No evidence
+                    "headers": {},                        # No headers
+                    "error": variations_err_msg.format(len(attempted_urls) - 1) if try_variations else ERR_MSG_RETRIES,
+                    "attempts": max_retries,
+                    "attempted_urls": attempted_urls
+                }
+                log(f"Failed after all attempts: {u} (tried {len(attempted_urls)} URL(s))")
+                await put_result(err)
+
+                if failure_queue:
+                    check_writer_health()  # Fail fast if writer died
+                    # The failures file is always compact JSONL: encode here
+                    await failure_queue.put(_json_bytes(err))
+
+            # Process all URLs with a fixed pool of tasks pulling from a bounded
+            # queue: O(concurrency) live tasks instead of one per URL. The pool
+            # size is the global concurrency bound.
+            url_queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+
+            async def worker_loop():
+                while True:
+                    u = await url_queue.get()
+                    try:
+                        await worker(u)
+                    finally:
+                        url_queue.task_done()
+
+            async def feed_urls():
+                for u in urls:
+                    await url_queue.put(u)
+                await url_queue.join()
+
+            pool = [asyncio.create_task(worker_loop()) for _ in range(max(1, min(concurrency, total_urls)))]
+            feeder = asyncio.create_task(feed_urls())
+            try:
+                # Worker loops only finish by raising, so whichever completes
+                # first is either the feeder (all done) or a failure to surface
+                done, _ = await asyncio.wait([feeder, *pool], return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+            finally:
+                for task in (feeder, *pool):
+                    task.cancel()
+                await asyncio.gather(feeder, *pool, return_exceptions=True)
+
+            # Drain worker log lines before the shutdown and summary messages
+            await stop_logger()
 
             # Ensure we can shutdown even if paused
             if pause_event and not pause_event.is_set():
@@ -1247,10 +1706,51 @@ async def run(urls: List[str], concurrency: int = 2, render: bool = False, valid
                     print(f"HubSpot Found: {tracker.hubspot_found}/{tracker.success_count} ({hs_pct:.1f}%) | Unique Hub IDs: {len(tracker.hub_ids)}", file=sys.stderr)
                     print(f"Total Time: {tracker.format_time(tracker.get_elapsed_time())} | Average Rate: {tracker.get_rate():.1f} URL/s", file=sys.stderr)
     finally:
+        await stop_logger()
+        if browser is not None:
+            await browser.close()
+        if playwright is not None:
+            await playwright.stop()
+        parse_pool.shutdown(wait=False)
         # Close checkpoint file
         if checkpoint_handle:
             checkpoint_handle.close()
 
-def parse_urls_from_file(path: str) -> List[str]:
-    with open(path, "r", encoding="utf-8") as f:
-        return [ln.strip() for ln in f if ln.strip() and not ln.strip().startswith("#")]
+def iter_urls_from_file(path: str) -> Iterator[str]:
+    """Yield URLs from a file lazily (one per line; blank lines and '#' comments skipped).
+
+    The one URL file parser: lines are stripped of surrounding whitespace and
+    a leading UTF-8 BOM is ignored. Only the read buffer (1 MiB) is held, so
+    crawling can start before a very large file has been read. Pair with
+    run(..., total_urls=...).
+    """
+    with open(path, "r", encoding="utf-8-sig", buffering=1 << 20) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+def parse_urls_from_file(path: str, dedup: bool = False, exclude: Optional[Container[str]] = None,
+                         counts: Optional[Dict[str, int]] = None) -> List[str]:
+    """Read URLs from a file (one per line; blank lines and '#' comments skipped).
+
+    Args:
+        path: File to read
+        dedup: Drop repeated URLs, keeping the first occurrence
+        exclude: URLs to leave out (e.g. already completed in a checkpoint)
+        counts: If given, filled with the number of URLs dropped as
+            "duplicates" and as "excluded" (deduplication runs first)
+
+    Parsing rules are those of iter_urls_from_file.
+    """
+    urls = list(iter_urls_from_file(path))
+    total = len(urls)
+    if dedup:
+        urls = list(dict.fromkeys(urls))
+    unique = len(urls)
+    if exclude:
+        urls = list(filterfalse(exclude.__contains__, urls))
+    if counts is not None:
+        counts["duplicates"] = total - unique
+        counts["excluded"] = unique - len(urls)
+    return urls
@@ -1,19 +1,81 @@
 
 import re
 import json
-from datetime import datetime
+import time
 from typing import Dict, List, Optional, Any
 
 # Load patterns at import time
 import importlib.resources as pkg_resources
 from . import patterns as _patterns_pkg
 
+# Optional: google-re2 (linear-time DFA matching, no catastrophic backtracking)
+try:
+    import re2
+    _HAS_RE2 = True
+except Exception:
+    _HAS_RE2 = False
+
+
+# (epoch second, "YYYY-MM-DDTHH:MM:SS") of the last timestamp formatted
+_iso_second = (-1, "")
+
+
+def _iso_now() -> str:
+    """Current UTC time as ISO 8601 with microseconds and a "Z" suffix.
+
+    The seconds part is formatted once per wall-clock second and reused, so
+    most calls only format the microseconds.
+    """
+    global _iso_second
+    secs, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    if secs != _iso_second[0]:
+        _iso_second = (secs, time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(secs)))
+    return f"{_iso_second[1]}.{micros:06d}Z"
+
+
+def _compile(pattern: str):
+    """Compile a detector pattern case-insensitive and multiline.
+
+    Uses RE2 when installed; patterns RE2 cannot express fall back to re.
+    Both return match objects with the group()/lastindex API used here.
+    """
+    if _HAS_RE2:
+        try:
+            return re2.compile("(?im)" + pattern)
+        except Exception:
+            pass
+    return re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+
+
 _PATTERNS_RAW = json.loads(pkg_resources.files(_patterns_pkg).joinpath("hubspot_patterns.json").read_text())
-RX: Dict[str, re.Pattern] = {
-    k: re.compile(v, re.IGNORECASE | re.MULTILINE)
+RX: Dict[str, Any] = {
+    k: _compile(v)
     for k, v in _PATTERNS_RAW["patterns"].items()
 }
 
+# Every pattern detect_html looks for
+_HTML_PATTERN_IDS = (
+    "tracking_loader_script", "tracking_script_any", "analytics_core", "_hsq_presence",
+    "banner_helper", "url_params_hs", "cookie_any", "forms_v2_loader", "forms_create_call",
+    "forms_hidden_hs_context", "chat_usemessages_js", "chat_usemessages_api", "cookie_messagesUtk",
+    "cta_loader_legacy", "cta_load_call", "cta_redirect_link", "meetings_embed_js", "meetings_iframe",
+    "cms_meta_generator", "cms_wrapper_class", "cms_internal_paths", "cms_host_hs_sites",
+    "cms_files_hubspotusercontent", "cms_files_hubfs_path", "video_hubspotvideo",
+    "email_hubspot_marketing_click", "email_hubspotlinks",
+)
+
+# With RE2, all of them unioned into one DFA: a single pass answers "anything
+# HubSpot on this page?" so pages without HubSpot skip the per-pattern scans.
+# Not built for stdlib re, where a large alternation is slower than the scans.
+_HTML_ANY = None
+if _HAS_RE2:
+    try:
+        _HTML_ANY = re2.compile("(?im)" + "|".join(
+            "(?:%s)" % _PATTERNS_RAW["patterns"][k] for k in _HTML_PATTERN_IDS
+        ))
+    except Exception:
+        _HTML_ANY = None
+
 Evidence = Dict[str, Any]
 
 def _push(evid: List[Evidence], category: str, pattern_id: str, match: str,
@@ -29,6 +91,8 @@ def _push(evid: List[Evidence], category: str, pattern_id: str, match: str,
     })
 
 def detect_html(html: str) -> List[Evidence]:
+    if _HTML_ANY is not None and _HTML_ANY.search(html) is None:
+        return []
     ev: List[Evidence] = []
     m_loader = RX["tracking_loader_script"].search(html)
     if m_loader:
@@ -254,7 +318,7 @@ def make_result(original_url: str, final_url: str, evidence: List[Evidence], hea
     result = {
         "original_url": original_url,
         "final_url": final_url,
-        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "timestamp": _iso_now(),
         "hubspot_detected": hubspot_detected,
         "hubIds": hub_ids,
         "summary": summary,
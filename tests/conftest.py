@@ -3,6 +3,7 @@ Pytest configuration and shared fixtures for HubSpot crawler tests.
 """
 import pytest
 from pathlib import Path
+from unittest.mock import AsyncMock, patch
 
 
 @pytest.fixture
@@ -317,3 +318,17 @@ def sample_html_tracking_no_id(fixtures_dir):
     </body>
     </html>
     """
+
+
+@pytest.fixture
+def mock_http_client():
+    """Patch the crawler's httpx.AsyncClient for end-to-end run() tests.
+
+    Returns the client run() will use; assign its async ``get`` in the test.
+    """
+    with patch('hubspot_crawler.crawler.httpx.AsyncClient') as mock_client_class:
+        mock_client = AsyncMock()
+        mock_client.__aenter__.return_value = mock_client
+        mock_client.__aexit__.return_value = None
+        mock_client_class.return_value = mock_client
+        yield mock_client
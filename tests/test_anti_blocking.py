@@ -6,6 +6,7 @@ Covers:
 - Request delays with jitter
 - Smart 429/403 detection
 - Conservative exponential backoff
+- Retry classification of fetch errors
 - Domain semaphore isolation
 """
 
@@ -235,3 +236,43 @@ class TestBackoffTiming:
             assert attempt_count[0] == 3, f"Expected 3 attempts, got {attempt_count[0]}"
             # Allow some tolerance for timing
             assert elapsed >= 19.0, f"Expected >= 19s for backoffs (5s + 15s), got {elapsed}s"
+
+
+class TestRetryClassification:
+    """Test which fetch failures are retried"""
+
+    async def _count_attempts(self, mock_http_client, exc):
+        attempt_count = [0]
+
+        async def mock_get_failing(*args, **kwargs):
+            attempt_count[0] += 1
+            raise exc
+
+        mock_http_client.get = mock_get_failing
+        await run(["https://example.com"], concurrency=1, delay=0.0, jitter=0.0,
+                  max_retries=3, max_per_domain=1, quiet=True)
+        return attempt_count[0]
+
+    @pytest.mark.asyncio
+    async def test_digit_five_in_message_is_not_transient(self, mock_http_client):
+        """A '5' in an unrelated error (e.g. a port number) must not trigger retries"""
+        assert await self._count_attempts(mock_http_client, Exception("SSL handshake failed on port 5432")) == 1
+
+    @pytest.mark.asyncio
+    async def test_unsupported_protocol_is_not_retried(self, mock_http_client):
+        """Typed non-transient fetch errors fail immediately"""
+        import httpx
+        assert await self._count_attempts(mock_http_client, httpx.UnsupportedProtocol("Request URL has an unsupported protocol")) == 1
+
+    @pytest.mark.asyncio
+    async def test_status_digits_inside_numbers_are_not_status_codes(self, mock_http_client):
+        """'403' inside a longer number is not a Forbidden response"""
+        with patch('hubspot_crawler.crawler.asyncio.sleep', new=AsyncMock()):  # skip the backoffs
+            assert await self._count_attempts(mock_http_client, Exception("connection refused on port 14030")) == 3
+
+    @pytest.mark.asyncio
+    async def test_typed_fetch_error_message_is_not_sniffed(self, mock_http_client):
+        """A transport error mentioning 403 is retried as transient, not treated as Forbidden"""
+        import httpx
+        with patch('hubspot_crawler.crawler.asyncio.sleep', new=AsyncMock()):
+            assert await self._count_attempts(mock_http_client, httpx.ConnectError("upstream proxy returned 403")) == 3
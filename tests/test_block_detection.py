@@ -2,8 +2,10 @@
 Tests for block detection functionality.
 """
 
+import asyncio
 import pytest
-from hubspot_crawler.crawler import BlockDetector
+from unittest.mock import MagicMock, patch
+from hubspot_crawler.crawler import BlockDetector, handle_pause_prompt
 from collections import deque
 
 
@@ -111,6 +113,21 @@ class TestBlockDetector:
         # Should only keep last 10
         assert len(detector.recent_attempts) == 10
 
+    def test_blocking_count_follows_window(self):
+        """Blocking failures evicted from the window stop counting"""
+        detector = BlockDetector(threshold=3, window_size=4)
+
+        for i in range(4):
+            detector.record_attempt(f"https://example{i}.com", success=False, status_code=403)
+        assert detector.blocking_count == 4
+
+        for i in range(3):
+            detector.record_attempt(f"https://ok{i}.com", success=True, status_code=200)
+
+        assert detector.blocking_count == 1
+        assert detector.blocking_count == sum(1 for a in detector.recent_attempts if a[2])
+        assert detector.is_likely_blocked() == (False, {})
+
     def test_not_blocked_insufficient_failures(self):
         """Test blocking not triggered with insufficient failures"""
         detector = BlockDetector(threshold=5, window_size=20)
@@ -218,6 +235,7 @@ class TestBlockDetector:
         detector.reset()
 
         assert len(detector.recent_attempts) == 0
+        assert detector.blocking_count == 0
         # Retry queue should be preserved
         assert len(detector.failed_urls_for_retry) == 5
 
@@ -303,3 +321,36 @@ class TestBlockDetectionIntegration:
         # Should only count blocking failures (5)
         assert stats['blocking_failures'] == 5
         assert stats['total_attempts'] == 8  # 3 non-blocking + 5 blocking
+
+
+class TestPausePrompt:
+    """Test the interactive pause prompt"""
+
+    @pytest.mark.asyncio
+    async def test_continue_resumes_workers(self, capsys):
+        """Answering 'c' prints the banner once and sets the pause event"""
+        pause_event = asyncio.Event()
+        fake_stdin = MagicMock()
+        fake_stdin.isatty.return_value = True
+        fake_stdin.readline.return_value = "c\n"
+
+        with patch("hubspot_crawler.crawler.sys.stdin", fake_stdin), \
+             patch("hubspot_crawler.crawler.select.select", return_value=([fake_stdin], [], [])):
+            await handle_pause_prompt(pause_event, BlockDetector(), auto_resume_secs=5)
+
+        err = capsys.readouterr().err
+        assert pause_event.is_set()
+        assert err.count("CRAWL PAUSED") == 1
+        assert "Auto-resume in 5s" in err
+        assert "Your choice [c/q]: " in err
+
+    @pytest.mark.asyncio
+    async def test_quit_exits(self):
+        """Answering 'q' exits the process"""
+        fake_stdin = MagicMock()
+        fake_stdin.isatty.return_value = True
+
+        with patch("hubspot_crawler.crawler.sys.stdin", fake_stdin), \
+             patch("builtins.input", return_value="q"):
+            with pytest.raises(SystemExit):
+                await handle_pause_prompt(asyncio.Event(), BlockDetector(), auto_resume_secs=0)
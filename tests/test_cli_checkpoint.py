@@ -0,0 +1,372 @@
+"""
+Tests for CLI input preparation (checkpoint resume, deduplication, validation).
+
+Covers:
+- Duplicate removal preserving order
+- Skipping URLs already recorded in the checkpoint
+- Early exit when everything is already completed
+- Numeric argument validation
+- Parser caching and the --url pre-pass
+- Event loop selection
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock
+from hubspot_crawler.cli import main
+from hubspot_crawler.crawler import run, CompletedUrls
+
+
+def _run_main(argv, return_kwargs=False):
+    """Run the CLI with crawler.run mocked out; return the URLs it would crawl."""
+    with patch('hubspot_crawler.crawler.run', new=MagicMock()) as mock_crawl, \
+         patch('hubspot_crawler.cli._run_event_loop') as mock_run, \
+         patch('sys.argv', ['hubspot-crawl'] + argv):
+        main()
+    if not mock_crawl.called:
+        return None
+    if return_kwargs:
+        return mock_crawl.call_args[1]
+    return mock_crawl.call_args[0][0]
+
+
+class TestCheckpointResume:
+    """Test resume-from-checkpoint filtering in the CLI"""
+
+    def test_completed_urls_are_skipped(self, tmp_path):
+        """URLs listed in the checkpoint should not be crawled again"""
+        input_file = tmp_path / "urls.txt"
+        input_file.write_text("https://a.com\nhttps://b.com\nhttps://c.com\n")
+        checkpoint = tmp_path / "checkpoint.txt"
+        checkpoint.write_text("https://b.com\n\n  https://a.com  \n")
+
+        urls = _run_main(['--input', str(input_file), '--checkpoint', str(checkpoint), '--quiet'])
+
+        assert urls == ["https://c.com"]
+
+    def test_input_file_duplicates_and_completed_filtered(self, tmp_path):
+        """Input file is deduplicated and filtered against the checkpoint"""
+        input_file = tmp_path / "urls.txt"
+        input_file.write_text("https://a.com\nhttps://c.com\nhttps://a.com\nhttps://c.com\n")
+        checkpoint = tmp_path / "checkpoint.txt"
+        checkpoint.write_text("https://a.com\n")
+
+        urls = _run_main(['--input', str(input_file), '--url', 'https://c.com',
+                          '--url', 'https://a.com', '--checkpoint', str(checkpoint), '--quiet'])
+
+        assert urls == ["https://c.com"]
+
+    def test_missing_checkpoint_crawls_everything(self, tmp_path):
+        """A checkpoint path that does not exist yet should not filter anything"""
+        checkpoint = tmp_path / "missing.txt"
+
+        urls = _run_main(['--url', 'https://a.com', '--url', 'https://b.com',
+                          '--checkpoint', str(checkpoint), '--quiet'])
+
+        assert urls == ["https://a.com", "https://b.com"]
+
+    def test_all_completed_exits_without_crawling(self, tmp_path, capsys):
+        """Nothing should be crawled when every URL is already in the checkpoint"""
+        checkpoint = tmp_path / "checkpoint.txt"
+        checkpoint.write_text("https://a.com\n")
+
+        urls = _run_main(['--url', 'https://a.com', '--checkpoint', str(checkpoint)])
+
+        assert urls is None
+        assert "All URLs already completed!" in capsys.readouterr().err
+
+    def test_checkpoint_without_urls_is_an_error(self, tmp_path, capsys):
+        """A checkpoint alone does not satisfy the --url/--input requirement"""
+        checkpoint = tmp_path / "checkpoint.txt"
+        checkpoint.write_text("https://a.com\n")
+
+        with pytest.raises(SystemExit):
+            _run_main(['--checkpoint', str(checkpoint)])
+
+        assert "Provide --url or --input" in capsys.readouterr().err
+
+    def test_resume_reports_input_file_counts(self, tmp_path, capsys):
+        """Duplicates and completed URLs dropped while reading --input are reported"""
+        input_file = tmp_path / "urls.txt"
+        input_file.write_text("https://a.com\nhttps://b.com\nhttps://a.com\nhttps://c.com\n")
+        checkpoint = tmp_path / "checkpoint.txt"
+        checkpoint.write_text("https://a.com\nhttps://b.com\n")
+
+        urls = _run_main(['--input', str(input_file), '--checkpoint', str(checkpoint)])
+
+        err = capsys.readouterr().err
+        assert urls == ["https://c.com"]
+        assert "Removed 1 duplicate URLs" in err
+        assert "Skipping 2 already-completed URLs" in err
+
+    def test_completed_set_not_passed_to_run(self, tmp_path):
+        """The CLI filters against the checkpoint itself, so run() does not re-check"""
+        checkpoint = tmp_path / "checkpoint.txt"
+        checkpoint.write_text("https://a.com\n")
+
+        kwargs = _run_main(['--url', 'https://a.com', '--url', 'https://b.com',
+                            '--checkpoint', str(checkpoint), '--quiet'],
+                           return_kwargs=True)
+
+        assert "completed_urls" not in kwargs
+
+    @pytest.mark.asyncio
+    async def test_run_skips_completed_urls(self, mock_http_client):
+        """run() itself skips URLs listed in completed_urls"""
+        fetched = []
+
+        async def mock_get(url, **kwargs):
+            fetched.append(url)
+            response = MagicMock()
+            response.text = "<html></html>"
+            response.headers = {}
+            response.status_code = 200
+            response.url = url
+            return response
+
+        mock_http_client.get = mock_get
+        await run(["https://a.com", "https://b.com"], delay=0.0, jitter=0.0, quiet=True,
+                  completed_urls=CompletedUrls(["https://a.com"]))
+
+        assert fetched == ["https://b.com"]
+
+    @pytest.mark.asyncio
+    async def test_run_writes_successes_to_checkpoint(self, tmp_path, mock_http_client):
+        """Successful URLs are appended to the checkpoint (failures are not)"""
+        checkpoint = tmp_path / "checkpoint.txt"
+
+        async def mock_get(url, **kwargs):
+            if "bad" in url:
+                raise ValueError("unsupported")
+            response = MagicMock()
+            response.text = "<html></html>"
+            response.headers = {}
+            response.status_code = 200
+            response.url = url
+            return response
+
+        mock_http_client.get = mock_get
+        await run(["https://a.com", "https://bad.com", "https://c.com"], delay=0.0, jitter=0.0,
+                  quiet=True, max_retries=1, progress_interval=2, checkpoint_file=str(checkpoint))
+
+        assert sorted(checkpoint.read_text().split()) == ["https://a.com", "https://c.com"]
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_flushed_between_progress_ticks(self, tmp_path, mock_http_client):
+        """Checkpoint lines reach the file after FLUSH_SECS even with a long progress interval"""
+        checkpoint = tmp_path / "checkpoint.txt"
+        seen_on_disk = {}
+
+        async def mock_get(url, **kwargs):
+            seen_on_disk[url] = checkpoint.read_text() if checkpoint.exists() else ""
+            response = MagicMock()
+            response.text = "<html></html>"
+            response.headers = {}
+            response.status_code = 200
+            response.url = url
+            return response
+
+        mock_http_client.get = mock_get
+        with patch('hubspot_crawler.crawler.FLUSH_SECS', 0.0):
+            await run(["https://a.com", "https://b.com"], concurrency=1, delay=0.0, jitter=0.0,
+                      quiet=True, progress_interval=100, checkpoint_file=str(checkpoint))
+
+        assert seen_on_disk["https://b.com"] == "https://a.com\n"
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_waits_for_output_flush(self, tmp_path, mock_http_client):
+        """URLs are checkpointed only after their results are flushed to the output file"""
+        checkpoint = tmp_path / "checkpoint.txt"
+        out = tmp_path / "results.jsonl"
+        seen_on_disk = []
+
+        async def mock_get(url, **kwargs):
+            seen_on_disk.append(checkpoint.read_text() if checkpoint.exists() else "")
+            response = MagicMock()
+            response.text = "<html></html>"
+            response.headers = {}
+            response.status_code = 200
+            response.url = url
+            return response
+
+        mock_http_client.get = mock_get
+        with patch('hubspot_crawler.crawler.FLUSH_SECS', 1e9), \
+             patch('hubspot_crawler.crawler.FLUSH_EVERY', 10**6):
+            await run(["https://a.com", "https://b.com", "https://c.com"], concurrency=1, delay=0.0,
+                      jitter=0.0, quiet=True, progress_interval=1, output=str(out),
+                      checkpoint_file=str(checkpoint))
+
+        # Results stayed buffered until close, so nothing was checkpointed early
+        assert seen_on_disk == ["", "", ""]
+        assert checkpoint.read_text().split() == ["https://a.com", "https://b.com", "https://c.com"]
+        assert len(out.read_text().splitlines()) == 3
+
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_written_while_crawl_stalls(self, tmp_path, mock_http_client):
+        """A stalled crawl still checkpoints finished URLs within FLUSH_SECS, not after FLUSH_EVERY rows"""
+        checkpoint = tmp_path / "checkpoint.txt"
+        seen_on_disk = {}
+
+        async def mock_get(url, **kwargs):
+            if url == "https://b.com":
+                await asyncio.sleep(0.5)  # slow host: the writer's queue goes idle
+                seen_on_disk[url] = checkpoint.read_text()
+            response = MagicMock()
+            response.text = "<html></html>"
+            response.headers = {}
+            response.status_code = 200
+            response.url = url
+            return response
+
+        mock_http_client.get = mock_get
+        with patch('hubspot_crawler.crawler.FLUSH_SECS', 0.1), \
+             patch('hubspot_crawler.crawler.FLUSH_EVERY', 10**6):
+            await run(["https://a.com", "https://b.com"], concurrency=1, delay=0.0, jitter=0.0,
+                      quiet=True, output=str(tmp_path / "results.jsonl"), checkpoint_file=str(checkpoint))
+
+        assert seen_on_disk["https://b.com"] == "https://a.com\n"
+
+
+class TestDeduplication:
+    """Test order-preserving URL deduplication"""
+
+    def test_duplicates_removed_in_order(self, capsys):
+        """First occurrence wins and order is preserved"""
+        urls = _run_main(['--url', 'https://b.com', '--url', 'https://a.com',
+                          '--url', 'https://b.com'])
+
+        assert urls == ["https://b.com", "https://a.com"]
+        assert "Removed 1 duplicate URLs" in capsys.readouterr().err
+
+
+class TestArgumentValidation:
+    """Test numeric argument bounds checking"""
+
+    @pytest.mark.parametrize("argv, message", [
+        (['--concurrency', '0'], "--concurrency must be >= 1 (got 0)"),
+        (['--delay', '-1'], "--delay must be >= 0 (got -1.0)"),
+        (['--max-retries', '-1'], "--max-retries must be >= 0 (got -1)"),
+        (['--block-window', '0'], "--block-window must be >= 1 (got 0)"),
+    ])
+    def test_out_of_range_values_rejected(self, argv, message, capsys):
+        """Out-of-range values should exit with a descriptive argparse error"""
+        with pytest.raises(SystemExit):
+            _run_main(['--url', 'https://a.com', '--quiet'] + argv)
+
+        assert message in capsys.readouterr().err
+
+
+class TestParserCache:
+    """Test that the argument parser is built once per process"""
+
+    def test_parser_is_reused_across_calls(self):
+        """Repeated main() calls should share one parser instance"""
+        from hubspot_crawler.cli import _build_parser
+
+        assert _build_parser() is _build_parser()
+        _run_main(['--url', 'https://a.com', '--quiet'])
+        _run_main(['--url', 'https://b.com', '--quiet', '--mode', 'aggressive'])
+        assert _build_parser.cache_info().currsize == 1
+
+
+class TestParseArgs:
+    """Test the --url pre-pass against full argparse parsing"""
+
+    @pytest.mark.parametrize("argv", [
+        ['--url', 'https://a.com'],
+        ['--url', 'https://a.com', '--url', 'https://b.com', '--render', '--quiet'],
+        ['--input', 'urls.txt', '--mode', 'balanced', '--concurrency', '7', '--delay', '0.5'],
+        ['--url', 'a.com', '--output-format', 'csv', '--out', 'r.csv', '--block-detection',
+         '--block-action', 'warn', '--try-variations', '--max-variations', '2'],
+        ['--url=https://a.com', '--quiet', '--url', 'https://b.com'],
+        ['--input', 'urls.txt'],
+    ])
+    def test_matches_argparse(self, argv):
+        """The pre-pass yields the same namespace as argparse"""
+        from hubspot_crawler.cli import _build_parser, _parse_args
+
+        p = _build_parser()
+        assert _parse_args(p, argv) == p.parse_args(argv)
+
+    @pytest.mark.parametrize("argv", [
+        ['--url'],
+        ['--url', '--quiet'],
+        ['--mode', 'bogus', '--url', 'https://a.com'],
+        ['--unknown', '--url', 'https://a.com'],
+    ])
+    def test_errors_reported_by_argparse(self, argv, capsys):
+        """Malformed input still gets argparse's error message"""
+        from hubspot_crawler.cli import _build_parser, _parse_args
+
+        with pytest.raises(SystemExit):
+            _parse_args(_build_parser(), argv)
+
+        assert "error:" in capsys.readouterr().err
+
+    def test_many_repeated_urls(self):
+        """Thousands of --url flags skip argparse"""
+        from hubspot_crawler.cli import _build_parser, _parse_args
+
+        argv = []
+        for i in range(5000):
+            argv += ['--url', f'https://site{i}.com']
+        args = _parse_args(_build_parser(), argv)
+
+        assert len(args.url) == 5000
+        assert args.url[-1] == 'https://site4999.com'
+
+
+class TestEventLoop:
+    """Test how main() runs the crawl coroutine"""
+
+    def _main_loop_type(self):
+        loops = []
+
+        async def fake_run(*args, **kwargs):
+            loops.append(type(asyncio.get_running_loop()))
+
+        with patch('hubspot_crawler.crawler.run', new=fake_run), \
+             patch('sys.argv', ['hubspot-crawl', '--url', 'https://a.com', '--quiet']):
+            main()
+        return loops[0]
+
+    def test_global_policy_unchanged(self):
+        """main() does not replace the process-wide event loop policy"""
+        policy = asyncio.get_event_loop_policy()
+
+        self._main_loop_type()
+
+        assert asyncio.get_event_loop_policy() is policy
+
+    def test_runs_on_uvloop_when_installed(self):
+        """The crawl runs on a uvloop loop when uvloop is available"""
+        uvloop = pytest.importorskip("uvloop")
+
+        assert issubclass(self._main_loop_type(), uvloop.Loop)
+
+
+class TestCompletedUrls:
+    """Test the hashed checkpoint membership set"""
+
+    def test_membership(self):
+        """Lookups are by URL even though only hashes are stored"""
+        completed = CompletedUrls(["https://a.com", "https://b.com", "https://a.com"])
+
+        assert "https://a.com" in completed
+        assert "https://c.com" not in completed
+        assert len(completed) == 2
+
+    def test_from_file_ignores_blank_lines(self, tmp_path):
+        """Checkpoint lines are stripped and blanks skipped"""
+        checkpoint = tmp_path / "checkpoint.txt"
+        checkpoint.write_text("https://a.com\n\n  https://b.com \r\n")
+
+        completed = CompletedUrls.from_file(str(checkpoint))
+
+        assert len(completed) == 2
+        assert "https://b.com" in completed
+
+    def test_empty_is_falsy(self):
+        """An empty set is falsy so callers can skip filtering"""
+        assert not CompletedUrls()
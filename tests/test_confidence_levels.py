@@ -8,8 +8,11 @@ Tests the specification requirements:
 - Tracking without definitive loader = strong
 - No tracking but strong evidence = moderate
 - No evidence = weak
+- Result timestamps in ISO 8601 UTC
 """
+import re
 import pytest
+from datetime import datetime, timezone
 from hubspot_crawler.detector import detect_html, summarise, make_result
 
 
@@ -186,6 +189,16 @@ class TestEdgeCases:
         assert result["summary"]["tracking"] is False
         assert result["summary"]["cmsHosting"] is False
 
+    def test_make_result_timestamp_is_utc_iso(self):
+        """make_result timestamps are ISO 8601 UTC with microseconds and a Z suffix."""
+        before = datetime.now(timezone.utc)
+        stamp = make_result("https://example.com", "https://example.com", [])["timestamp"]
+        after = datetime.now(timezone.utc)
+
+        assert re.fullmatch(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}Z", stamp)
+        parsed = datetime.fromisoformat(stamp[:-1]).replace(tzinfo=timezone.utc)
+        assert before <= parsed <= after
+
     def test_make_result_with_invalid_hub_id(self):
         """make_result should handle non-integer Hub IDs."""
         evidence = [
@@ -7,11 +7,14 @@ Tests the full flow:
 - Cookie parsing from Set-Cookie headers
 - Result formatting
 - Schema validation
+- Playwright rendering with a shared browser
+- Shared client construction
 """
 import pytest
 import httpx
 import respx
-from hubspot_crawler.crawler import process_url, fetch_html, normalize_url
+from unittest.mock import AsyncMock, MagicMock, patch
+from hubspot_crawler.crawler import process_url, fetch_html, normalize_url, FetchError, render_with_playwright, make_client
 
 
 class TestNormalizeURL:
@@ -32,6 +35,23 @@ class TestNormalizeURL:
         url = normalize_url("http://example.com")
         assert url == "http://example.com"
 
+    def test_preserves_uppercase_scheme(self):
+        """Scheme detection should be case-insensitive."""
+        assert normalize_url("HTTPS://example.com") == "HTTPS://example.com"
+
+    def test_protocol_relative_url(self):
+        """Should complete a protocol-relative URL with https."""
+        assert normalize_url("//example.com/page") == "https://example.com/page"
+
+    @pytest.mark.parametrize("url", ["ftp://example.com", "mailto:a@example.com", "HTTPS:/example.com", "javascript:void(0)"])
+    def test_preserves_other_schemes(self, url):
+        """URLs with any other scheme are returned unchanged, not prefixed with https://."""
+        assert normalize_url(url) == url
+
+    def test_host_with_port_gets_https(self):
+        """host:port is not mistaken for a scheme."""
+        assert normalize_url("example.com:8080/page") == "https://example.com:8080/page"
+
 
 @pytest.mark.asyncio
 class TestFetchHTML:
@@ -106,6 +126,20 @@ class TestFetchHTML:
             with pytest.raises(RuntimeError, match="HTTP error"):
                 await fetch_html(client, url)
 
+    @respx.mock
+    async def test_network_error_is_typed_and_transient(self):
+        """Network errors raise FetchError marked as retryable."""
+        url = "https://reset.example.com"
+
+        respx.get(url).mock(side_effect=httpx.ConnectError("Connection reset"))
+
+        async with httpx.AsyncClient() as client:
+            with pytest.raises(FetchError) as exc_info:
+                await fetch_html(client, url)
+
+        assert exc_info.value.transient is True
+        assert exc_info.value.url == url
+
 
 @pytest.mark.asyncio
 class TestProcessURL:
@@ -176,6 +210,26 @@ class TestProcessURL:
         assert len(cookie_evidence) >= 1, "Should detect hubspotutk cookie"
         assert cookie_evidence[0]["confidence"] == "definitive"
 
+    @respx.mock
+    async def test_process_url_parses_multiple_set_cookie_headers(self):
+        """Should see every cookie when the response sets several."""
+        url = "https://example.com"
+        html = "<html><body>Test</body></html>"
+
+        headers = [
+            ("set-cookie", "session=xyz; Path=/"),
+            ("set-cookie", "__hstc=1.2.3; Path=/"),
+            ("set-cookie", "hubspotutk=abc123; Path=/; HttpOnly"),
+        ]
+
+        respx.get(url).mock(return_value=httpx.Response(200, text=html, headers=headers))
+
+        async with httpx.AsyncClient() as client:
+            result = await process_url(url, url, client, render=False, validate=False)
+
+        cookie_names = {e["match"] for e in result["evidence"] if e["category"] == "cookies"}
+        assert cookie_names == {"__hstc", "hubspotutk"}
+
     @respx.mock
     async def test_process_url_with_no_hubspot(self):
         """Should handle sites with no HubSpot."""
@@ -284,6 +338,23 @@ class TestProcessURL:
         assert result["final_url"] == original_url  # Should equal original, not normalized
         assert result.get("http_status") == 500
 
+    @respx.mock
+    async def test_validate_loads_schema_once(self):
+        """validate=True checks results against the schema, built once per process."""
+        pytest.importorskip("jsonschema")
+        from hubspot_crawler.crawler import _get_validator
+
+        url = "https://example.com"
+        respx.get(url).mock(return_value=httpx.Response(200, text="<html><title>Plain</title></html>"))
+        _get_validator.cache_clear()
+
+        async with httpx.AsyncClient() as client:
+            for _ in range(3):
+                result = await process_url(url, url, client, render=False, validate=True)
+
+        assert result["hubspot_detected"] is False
+        assert _get_validator.cache_info().misses == 1
+
 
 @pytest.mark.asyncio
 class TestCookieDetection:
@@ -347,3 +418,73 @@ class TestCookieDetection:
         cookie_evidence = [e for e in result["evidence"] if e["category"] == "cookies"]
         # Should detect both cookies
         assert len(cookie_evidence) >= 2
+
+
+@pytest.mark.asyncio
+class TestRenderWithPlaywright:
+    """Test rendering against a caller-supplied browser."""
+
+    async def test_shared_browser_is_not_closed(self):
+        """Should close the per-URL context but leave the shared browser running."""
+        response = MagicMock(status=200, headers={"content-type": "text/html"})
+        page = MagicMock()
+        page.goto = AsyncMock(return_value=response)
+        page.content = AsyncMock(return_value="<html></html>")
+        page.wait_for_timeout = AsyncMock()
+        page.url = "https://example.com/"
+        ctx = MagicMock()
+        ctx.new_page = AsyncMock(return_value=page)
+        ctx.close = AsyncMock()
+        browser = MagicMock()
+        browser.new_context = AsyncMock(return_value=ctx)
+        browser.close = AsyncMock()
+
+        with patch('hubspot_crawler.crawler._HAS_PLAYWRIGHT', True):
+            html, network, headers, status, final_url = await render_with_playwright(
+                "https://example.com", "UA", browser)
+
+        assert (html, status, final_url) == ("<html></html>", 200, "https://example.com/")
+        assert headers == {"content-type": "text/html"}
+        ctx.close.assert_awaited_once()
+        browser.close.assert_not_awaited()
+
+    async def test_run_survives_browser_launch_failure(self, tmp_path):
+        """A failed shared launch falls back to per-URL rendering/static fetch instead of aborting run()."""
+        from hubspot_crawler.crawler import run
+
+        playwright = MagicMock()
+        playwright.chromium.launch = AsyncMock(side_effect=RuntimeError("Executable doesn't exist"))
+        playwright.stop = AsyncMock()
+        starter = MagicMock()
+        starter.start = AsyncMock(return_value=playwright)
+        results = []
+
+        async def fake_process_url(original_url, url, client, render, validate, executor=None, browser=None):
+            results.append((url, browser))
+            return {"original_url": original_url, "final_url": url, "hubspot_detected": False,
+                    "hubIds": [], "summary": {}, "evidence": []}
+
+        with patch('hubspot_crawler.crawler._HAS_PLAYWRIGHT', True), \
+             patch('hubspot_crawler.crawler.async_playwright', return_value=starter, create=True), \
+             patch('hubspot_crawler.crawler.process_url', side_effect=fake_process_url):
+            await run(["https://example.com"], render=True, delay=0.0, jitter=0.0, quiet=True,
+                      output=str(tmp_path / "results.jsonl"))
+
+        assert results == [("https://example.com", None)]
+        playwright.stop.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+class TestMakeClient:
+    """Test the shared HTTP client factory."""
+
+    @respx.mock
+    async def test_client_sends_user_agent(self):
+        """The client carries the crawler's user agent on every request."""
+        route = respx.get("https://example.com").mock(return_value=httpx.Response(200, text="<html></html>"))
+
+        async with make_client(concurrency=4, user_agent="TestAgent/1.0") as client:
+            html, headers, status, final_url = await fetch_html(client, "https://example.com")
+
+        assert status == 200
+        assert route.calls.last.request.headers["user-agent"] == "TestAgent/1.0"
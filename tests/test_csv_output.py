@@ -9,12 +9,16 @@ Covers:
 - Null/None handling
 - Evidence counting
 - End-to-end CSV generation
+- Batched writer thread hops
+- Reporting flushed rows (checkpoint ordering)
 """
 
 import pytest
+import asyncio
 import csv
 import io
-from hubspot_crawler.crawler import flatten_result_for_csv
+from unittest.mock import patch
+from hubspot_crawler.crawler import flatten_result_for_csv, flatten_result_row, csv_writer_worker, CSV_FIELDNAMES
 from hubspot_crawler.detector import make_result
 
 
@@ -243,3 +247,90 @@ class TestFlattenResultForCSV:
 
         assert set(flat.keys()) == set(expected_columns)
         assert len(flat) == 19  # Was 18, now 19 with two URL fields
+
+    def test_row_matches_dict_in_column_order(self):
+        """flatten_result_row gives the dict's values in CSV_FIELDNAMES order"""
+        evidence = [
+            {"category": "tracking", "patternId": "tracking_loader_script", "match": "test",
+             "source": "html", "hubId": 123, "confidence": "definitive"}
+        ]
+        result = make_result("https://example.com", "https://example.com/home", evidence,
+                             http_status=200, page_metadata={"title": "Home", "description": None})
+
+        row = flatten_result_row(result)
+        flat = flatten_result_for_csv(result)
+
+        assert list(flat) == list(CSV_FIELDNAMES)
+        assert row == list(flat.values())
+
+
+class TestCsvWriterWorker:
+    """Test the CSV writer coroutine"""
+
+    @pytest.mark.asyncio
+    async def test_writes_header_and_rows(self, tmp_path):
+        """Queued results become CSV rows under the header"""
+        out = tmp_path / "results.csv"
+        queue = asyncio.Queue()
+        await queue.put(make_result("https://a.com", "https://a.com", []))
+        await queue.put(make_result("https://b.com", "https://b.com", []))
+        await queue.put(None)
+
+        await csv_writer_worker(queue, str(out))
+
+        with open(out, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert [r["original_url"] for r in rows] == ["https://a.com", "https://b.com"]
+
+    @pytest.mark.asyncio
+    async def test_queued_results_share_one_thread_hop(self, tmp_path):
+        """Results already waiting in the queue are written in one to_thread call"""
+        out = tmp_path / "results.csv"
+        queue = asyncio.Queue()
+        for i in range(5):
+            queue.put_nowait(make_result(f"https://site{i}.com", f"https://site{i}.com", []))
+        queue.put_nowait(None)
+
+        with patch("hubspot_crawler.crawler.asyncio.to_thread", wraps=asyncio.to_thread) as to_thread:
+            await csv_writer_worker(queue, str(out))
+
+        assert to_thread.call_count == 1
+        assert len(out.read_text(encoding="utf-8").splitlines()) == 6  # header + 5 rows
+
+    @pytest.mark.asyncio
+    async def test_flushed_while_queue_idle(self, tmp_path):
+        """Buffered rows are flushed after FLUSH_SECS even if no further result arrives"""
+        out = tmp_path / "results.csv"
+        queue = asyncio.Queue()
+
+        with patch("hubspot_crawler.crawler.FLUSH_SECS", 0.2), \
+             patch("hubspot_crawler.crawler.FLUSH_EVERY", 10**6):
+            task = asyncio.create_task(csv_writer_worker(queue, str(out)))
+            await queue.put(make_result("https://a.com", "https://a.com", []))
+            await queue.join()
+            await asyncio.sleep(0.5)  # queue idle past FLUSH_SECS
+            on_disk = out.read_text(encoding="utf-8")
+            await queue.put(None)
+            await task
+
+        assert len(on_disk.splitlines()) == 2  # header + row
+
+    @pytest.mark.asyncio
+    async def test_on_flushed_after_close(self, tmp_path):
+        """Rows still in the write buffer are reported only once the file is closed"""
+        out = tmp_path / "results.csv"
+        queue = asyncio.Queue()
+        flushed = []
+
+        def on_flushed(n):
+            flushed.append((n, len(out.read_text(encoding="utf-8").splitlines())))
+
+        with patch("hubspot_crawler.crawler.FLUSH_SECS", 1e9):
+            task = asyncio.create_task(csv_writer_worker(queue, str(out), on_flushed=on_flushed))
+            await queue.put(make_result("https://a.com", "https://a.com", []))
+            await queue.join()
+            assert flushed == []
+            await queue.put(None)
+            await task
+
+        assert flushed == [(1, 2)]  # header + 1 row on disk when reported
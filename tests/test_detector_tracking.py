@@ -7,6 +7,8 @@ Tests the specification requirements:
 - Tracking loader = definitive confidence
 - Analytics core = strong confidence
 - Network tracking evidence = definitive confidence
+- Pattern compilation (RE2 with re fallback)
+- RE2 union prefilter for pages without HubSpot
 """
 import pytest
 from hubspot_crawler.detector import detect_html, detect_network
@@ -173,3 +175,44 @@ class TestTrackingDetection:
         assert len(script_any) == 1, "Should use tracking_script_any fallback pattern"
         assert script_any[0]["hubId"] == 54321, "Should extract Hub ID from URL"
         assert script_any[0]["confidence"] == "strong"
+
+
+class TestPatternCompilation:
+    """Detector patterns compile with RE2 when available, re otherwise."""
+
+    def test_compiled_patterns_are_case_insensitive(self):
+        """Case-insensitive matching must hold with either engine."""
+        from hubspot_crawler.detector import RX
+        m = RX["tracking_loader_script"].search('<SCRIPT ID="hs-script-loader" SRC="//JS.HS-SCRIPTS.COM/42.js"></SCRIPT>')
+        assert m is not None
+        assert m.group(1) == "42"
+
+    def test_unsupported_pattern_falls_back_to_re(self):
+        """Patterns RE2 cannot compile (e.g. backreferences) use the re module."""
+        import re
+        from hubspot_crawler.detector import _compile
+        rx = _compile(r"(ab)\1")
+        assert isinstance(rx, re.Pattern)
+        assert rx.search("xABab") is not None
+
+    def test_prefilter_covers_every_html_pattern(self):
+        """The union prefilter must include every pattern detect_html uses."""
+        import inspect
+        import re
+        from hubspot_crawler import detector
+        used = set(re.findall(r'RX\["(\w+)"\]', inspect.getsource(detector.detect_html)))
+        assert used == set(detector._HTML_PATTERN_IDS)
+
+    @pytest.mark.parametrize("fixture", [
+        "sample_html_with_tracking", "sample_html_cms_meta", "sample_html_cms_wrapper_with_hcms",
+        "sample_html_forms_complete", "sample_html_cta_complete", "sample_html_video",
+        "sample_html_chat", "sample_html_analytics", "sample_html_no_hubspot",
+        "sample_html_hsq_queue", "sample_html_url_params", "sample_html_banner_helper",
+    ])
+    def test_prefilter_does_not_change_results(self, fixture, request, monkeypatch):
+        """detect_html finds the same evidence with and without the prefilter."""
+        from hubspot_crawler import detector
+        html = request.getfixturevalue(fixture)
+        with_prefilter = detect_html(html)
+        monkeypatch.setattr(detector, "_HTML_ANY", None)
+        assert detect_html(html) == with_prefilter
@@ -5,10 +5,12 @@ Verifies that when all URL attempts fail, the error object:
 - Uses new schema (original_url + final_url)
 - Has required fields for CSV export
 - Works with flatten_result_for_csv()
+- Is written to the --failures JSONL file
 """
 
+import json
 import pytest
-from hubspot_crawler.crawler import flatten_result_for_csv
+from hubspot_crawler.crawler import flatten_result_for_csv, run
 from datetime import datetime
 
 
@@ -220,3 +222,27 @@ class TestFailureHandling:
         flat = flatten_result_for_csv(failure_result)
         assert flat["original_url"] == flat["final_url"]
         assert flat["original_url"] == "http://192.168.1.999"
+
+
+class TestFailuresFile:
+    """Test the failures JSONL written by run()"""
+
+    @pytest.mark.asyncio
+    async def test_failures_file_contains_error_results(self, tmp_path, mock_http_client):
+        """Each failed URL becomes one JSON line with its attempted URLs"""
+        failures = tmp_path / "failures.jsonl"
+
+        async def mock_get(url, **kwargs):
+            raise ValueError("unsupported")
+
+        mock_http_client.get = mock_get
+        await run(["a.com"], delay=0.0, jitter=0.0, quiet=True, max_retries=1,
+                  output=str(tmp_path / "results.jsonl"), failures_output=str(failures),
+                  try_variations=True, max_variations=2)
+
+        lines = failures.read_text().splitlines()
+        assert len(lines) == 1
+        err = json.loads(lines[0])
+        assert err["original_url"] == "a.com"
+        assert err["error"] == "Failed after all retry attempts and 2 URL variations"
+        assert err["attempted_urls"] == ["https://a.com", "https://www.a.com", "http://a.com"]
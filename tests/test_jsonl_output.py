@@ -0,0 +1,162 @@
+"""
+Tests for JSONL output (writer_worker).
+
+Covers:
+- One JSON object per line
+- Pre-encoded bytes items
+- Coalescing queued results into one write
+- Pretty-printed output
+- Time-bounded flushing
+- Reporting flushed items (checkpoint ordering)
+- Identical bytes with and without orjson
+"""
+
+import json
+import pytest
+import asyncio
+from unittest.mock import MagicMock, patch
+from hubspot_crawler.detector import make_result
+from hubspot_crawler.crawler import writer_worker, _json_bytes
+
+
+class TestJsonlOutput:
+    """Test JSONL file generation"""
+
+    @pytest.mark.asyncio
+    async def test_one_result_per_line(self, tmp_path):
+        """Each queued result becomes one parseable line"""
+        out = tmp_path / "results.jsonl"
+        queue = asyncio.Queue()
+        await queue.put(make_result("https://a.com", "https://a.com", []))
+        await queue.put(make_result("https://b.com", "https://b.com", []))
+        await queue.put(None)  # Poison pill
+
+        await writer_worker(queue, str(out))
+
+        lines = out.read_text().splitlines()
+        assert [json.loads(line)["original_url"] for line in lines] == ["https://a.com", "https://b.com"]
+
+    @pytest.mark.asyncio
+    async def test_accepts_pre_encoded_bytes(self, tmp_path):
+        """Bytes items are written as-is"""
+        out = tmp_path / "results.jsonl"
+        queue = asyncio.Queue()
+        await queue.put(b'{"original_url":"https://a.com"}')
+        await queue.put(None)
+
+        await writer_worker(queue, str(out))
+
+        assert out.read_bytes() == b'{"original_url":"https://a.com"}\n'
+
+    @pytest.mark.asyncio
+    async def test_queued_results_written_together(self):
+        """Results already waiting in the queue go out in a single write"""
+        queue = asyncio.Queue()
+        for i in range(3):
+            queue.put_nowait({"n": i})
+        queue.put_nowait(None)
+
+        fake_stdout = MagicMock()
+        with patch("hubspot_crawler.crawler.sys.stdout", fake_stdout):
+            await writer_worker(queue, None)
+
+        fake_stdout.write.assert_called_once()
+        written = fake_stdout.write.call_args.args[0]
+        assert [json.loads(line) for line in written.splitlines()] == [{"n": 0}, {"n": 1}, {"n": 2}]
+
+    @pytest.mark.asyncio
+    async def test_pretty_output(self, tmp_path):
+        """pretty=True indents each record"""
+        out = tmp_path / "results.json"
+        queue = asyncio.Queue()
+        await queue.put({"a": 1})
+        await queue.put(None)
+
+        await writer_worker(queue, str(out), pretty=True)
+
+        assert json.loads(out.read_text()) == {"a": 1}
+        assert "\n  " in out.read_text()
+
+    @pytest.mark.asyncio
+    async def test_flushed_after_flush_secs(self, tmp_path):
+        """A result reaches the file once FLUSH_SECS has passed, without waiting for FLUSH_EVERY rows"""
+        out = tmp_path / "results.jsonl"
+        queue = asyncio.Queue()
+
+        with patch("hubspot_crawler.crawler.FLUSH_SECS", 0.0):
+            task = asyncio.create_task(writer_worker(queue, str(out)))
+            await queue.put({"n": 1})
+            await queue.join()  # written, writer now waiting for more
+            on_disk = out.read_bytes()
+            await queue.put(None)
+            await task
+
+        assert json.loads(on_disk) == {"n": 1}
+
+    @pytest.mark.asyncio
+    async def test_flushed_while_queue_idle(self, tmp_path):
+        """Buffered lines are flushed after FLUSH_SECS even if no further result arrives"""
+        out = tmp_path / "results.jsonl"
+        queue = asyncio.Queue()
+
+        with patch("hubspot_crawler.crawler.FLUSH_SECS", 0.2), \
+             patch("hubspot_crawler.crawler.FLUSH_EVERY", 10**6):
+            task = asyncio.create_task(writer_worker(queue, str(out)))
+            await queue.put({"n": 1})
+            await queue.join()
+            await asyncio.sleep(0.5)  # queue idle past FLUSH_SECS
+            on_disk = out.read_bytes()
+            await queue.put(None)
+            await task
+
+        assert json.loads(on_disk) == {"n": 1}
+
+    @pytest.mark.asyncio
+    async def test_on_flushed_follows_flushes(self, tmp_path):
+        """on_flushed counts only items that were flushed, and the rest after close"""
+        out = tmp_path / "results.jsonl"
+        queue = asyncio.Queue()
+        flushed = []
+
+        def on_flushed(n):
+            flushed.append((n, len(out.read_bytes().splitlines())))
+
+        with patch("hubspot_crawler.crawler.FLUSH_EVERY", 2), \
+             patch("hubspot_crawler.crawler.FLUSH_SECS", 1e9):
+            task = asyncio.create_task(writer_worker(queue, str(out), on_flushed=on_flushed))
+            for i in range(3):
+                await queue.put({"n": i})
+                await queue.join()
+            await queue.put(None)
+            await task
+
+        # (items reported, lines on disk when reported)
+        assert flushed == [(2, 2), (1, 3)]
+
+
+class TestJsonEncoding:
+    """Test that the orjson and json paths produce the same bytes"""
+
+    SAMPLE = {
+        "original_url": "https://bücher.example/päge?q=1&r=</script>",
+        "hubIds": [123, 456],
+        "summary": {"tracking": True, "confidence": "strong", "ratio": 0.25},
+        "evidence": [{"match": "emoji \U0001F600 \"quoted\" \\ tab\t", "context": None}],
+        "headers": {},
+    }
+
+    @pytest.mark.parametrize("pretty", [False, True])
+    def test_orjson_and_json_match(self, pretty):
+        """The stdlib fallback writes exactly what orjson writes"""
+        pytest.importorskip("orjson")
+        with_orjson = _json_bytes(self.SAMPLE, pretty)
+        with patch("hubspot_crawler.crawler._HAS_ORJSON", False):
+            without_orjson = _json_bytes(self.SAMPLE, pretty)
+
+        assert with_orjson == without_orjson
+        assert json.loads(without_orjson) == self.SAMPLE
+
+    def test_fallback_is_compact_utf8(self):
+        """Without orjson, output is compact and keeps non-ASCII as UTF-8"""
+        with patch("hubspot_crawler.crawler._HAS_ORJSON", False):
+            assert _json_bytes({"a": [1, "ü"]}) == '{"a":[1,"ü"]}'.encode("utf-8")
@@ -89,7 +89,7 @@ class TestExtractPageMetadata:
         """Should handle title with only whitespace"""
         html = "<html><head><title>   </title></head></html>"
         result = extract_page_metadata(html)
-        # BeautifulSoup's get_text(strip=True) will return empty string, which becomes None
+        # Whitespace-only title strips to an empty string, which becomes None
         assert result["title"] is None or result["title"] == ""
 
     def test_handles_malformed_html(self):
@@ -105,7 +105,7 @@ class TestExtractPageMetadata:
         """Should handle meta name attribute case variations"""
         html = '<html><head><meta name="Description" content="Test"></head></html>'
         result = extract_page_metadata(html)
-        # BeautifulSoup find with attrs should be case-sensitive, so this tests actual behavior
+        # Attribute value match is case-sensitive, so this tests actual behavior
         assert result["description"] is None or result["description"] == "Test"
 
     def test_strips_whitespace_from_values(self):
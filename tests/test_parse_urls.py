@@ -0,0 +1,132 @@
+"""
+Tests for reading URL input files.
+
+Covers:
+- Blank lines, comments and surrounding whitespace
+- Optional deduplication
+- Excluding already-completed URLs
+- Streaming iteration for very large files
+- One set of parsing rules for both readers
+"""
+
+import pytest
+from unittest.mock import MagicMock
+from hubspot_crawler.crawler import parse_urls_from_file, iter_urls_from_file, run
+
+
+@pytest.fixture
+def url_file(tmp_path):
+    """Input file with comments, blanks, padding and duplicates."""
+    path = tmp_path / "urls.txt"
+    path.write_text(
+        "# header comment\n"
+        "https://a.com\n"
+        "\n"
+        "   https://b.com   \n"
+        "https://a.com\r\n"
+        "  # indented comment\n"
+        "https://c.com"
+    )
+    return path
+
+
+@pytest.fixture
+def tricky_url_file(tmp_path):
+    """BOM, CRLF and lone CR endings, tabs, '#' inside URLs, no final newline."""
+    path = tmp_path / "tricky.txt"
+    path.write_bytes(
+        b"\xef\xbb\xbfhttps://a.com\r\n"
+        b"\t https://b.com/#section \t\n"
+        b"   \n"
+        b"\t# tab-indented comment\r"
+        b"https://c.com/?q=#x\n"
+        b"https://b\xc3\xbccher.example/"
+    )
+    return path
+
+
+class TestParseUrlsFromFile:
+    """Test URL file parsing"""
+
+    def test_skips_blanks_and_comments(self, url_file):
+        """Blank lines and comments are dropped; whitespace is stripped"""
+        assert parse_urls_from_file(str(url_file)) == [
+            "https://a.com", "https://b.com", "https://a.com", "https://c.com"
+        ]
+
+    def test_dedup_keeps_first_occurrence(self, url_file):
+        """dedup=True drops repeats while preserving order"""
+        assert parse_urls_from_file(str(url_file), dedup=True) == [
+            "https://a.com", "https://b.com", "https://c.com"
+        ]
+
+    def test_exclude_filters_completed(self, url_file):
+        """URLs in exclude are left out"""
+        urls = parse_urls_from_file(str(url_file), dedup=True, exclude={"https://a.com"})
+        assert urls == ["https://b.com", "https://c.com"]
+
+    def test_counts_dropped_urls(self, url_file):
+        """counts reports duplicates and exclusions separately"""
+        counts = {}
+        urls = parse_urls_from_file(str(url_file), dedup=True, exclude={"https://a.com"}, counts=counts)
+        assert urls == ["https://b.com", "https://c.com"]
+        assert counts == {"duplicates": 1, "excluded": 1}
+
+    def test_empty_file(self, tmp_path):
+        """An empty file yields no URLs"""
+        path = tmp_path / "empty.txt"
+        path.write_text("")
+        assert parse_urls_from_file(str(path)) == []
+
+    def test_non_ascii_urls(self, tmp_path):
+        """UTF-8 URLs are decoded"""
+        path = tmp_path / "idn.txt"
+        path.write_text("https://bücher.example/\n", encoding="utf-8")
+        assert parse_urls_from_file(str(path)) == ["https://bücher.example/"]
+
+
+class TestIterUrlsFromFile:
+    """Test lazy URL iteration"""
+
+    @pytest.mark.parametrize("fixture", ["url_file", "tricky_url_file"])
+    def test_matches_parse_urls_from_file(self, fixture, request):
+        """Streaming yields exactly what the list reader returns"""
+        path = str(request.getfixturevalue(fixture))
+        assert list(iter_urls_from_file(path)) == parse_urls_from_file(path)
+
+    def test_tricky_file(self, tricky_url_file):
+        """BOM, mixed line endings, tabs and in-URL '#' are handled"""
+        assert list(iter_urls_from_file(str(tricky_url_file))) == [
+            "https://a.com", "https://b.com/#section", "https://c.com/?q=#x", "https://bücher.example/"
+        ]
+
+    def test_reads_incrementally(self, tmp_path):
+        """The first URL is yielded without reading (or decoding) the rest of the file"""
+        path = tmp_path / "big.txt"
+        # Invalid UTF-8 well past the read buffer: an eager read would fail here
+        path.write_bytes(b"https://a.com\n" + b"https://b.com\n" * 300_000 + b"\xff\n")
+
+        it = iter_urls_from_file(str(path))
+        assert next(it) == "https://a.com"
+        with pytest.raises(UnicodeDecodeError):
+            list(it)
+
+    @pytest.mark.asyncio
+    async def test_run_consumes_iterator(self, url_file, mock_http_client):
+        """run() crawls a lazy iterator when given the total up front"""
+        fetched = []
+
+        async def mock_get(url, **kwargs):
+            fetched.append(url)
+            response = MagicMock()
+            response.text = "<html></html>"
+            response.headers = {}
+            response.status_code = 200
+            response.url = url
+            return response
+
+        mock_http_client.get = mock_get
+        await run(iter_urls_from_file(str(url_file)), total_urls=4,
+                  delay=0.0, jitter=0.0, quiet=True, max_per_domain=2)
+
+        assert sorted(fetched) == ["https://a.com", "https://a.com", "https://b.com", "https://c.com"]
@@ -20,7 +20,7 @@ class TestPresetModes:
 
     def test_ultra_conservative_mode_settings(self):
         """Ultra-conservative mode should use slowest settings"""
-        with patch('hubspot_crawler.cli.asyncio.run') as mock_run, \
+        with patch('hubspot_crawler.cli._run_event_loop') as mock_run, \
              patch('sys.argv', ['hubspot-crawl', '--url', 'https://example.com', '--mode', 'ultra-conservative', '--quiet']):
 
             main()
@@ -31,7 +31,7 @@ class TestPresetModes:
             kwargs = call_args[1] if len(call_args) > 1 else {}
 
             # Ultra-conservative: concurrency=2, delay=3.0, jitter=1.0, max_per_domain=1
-            # Note: Since we're patching asyncio.run, we need to check the actual call
+            # Note: Since we're patching the event loop runner, we need to check the actual call
             # The positional args contain the URLs, kwargs contain the settings
             # We'll need to inspect what was passed
 
@@ -40,7 +40,7 @@ class TestPresetModes:
 
     def test_ultra_conservative_mode_is_default(self):
         """Ultra-conservative mode should be the default when no mode specified"""
-        with patch('hubspot_crawler.cli.asyncio.run') as mock_run, \
+        with patch('hubspot_crawler.cli._run_event_loop') as mock_run, \
              patch('sys.argv', ['hubspot-crawl', '--url', 'https://example.com', '--quiet']):
 
             main()
@@ -50,7 +50,7 @@ class TestPresetModes:
 
     def test_balanced_mode_settings(self):
         """Balanced mode should use medium settings"""
-        with patch('hubspot_crawler.cli.asyncio.run') as mock_run, \
+        with patch('hubspot_crawler.cli._run_event_loop') as mock_run, \
              patch('sys.argv', ['hubspot-crawl', '--url', 'https://example.com', '--mode', 'balanced', '--quiet']):
 
             main()
@@ -59,7 +59,7 @@ class TestPresetModes:
 
     def test_aggressive_mode_settings(self):
         """Aggressive mode should use fastest settings"""
-        with patch('hubspot_crawler.cli.asyncio.run') as mock_run, \
+        with patch('hubspot_crawler.cli._run_event_loop') as mock_run, \
              patch('sys.argv', ['hubspot-crawl', '--url', 'https://example.com', '--mode', 'aggressive', '--quiet']):
 
             main()
@@ -68,7 +68,7 @@ class TestPresetModes:
 
     def test_custom_override_concurrency(self):
         """Custom concurrency should override preset"""
-        with patch('hubspot_crawler.cli.asyncio.run') as mock_run, \
+        with patch('hubspot_crawler.cli._run_event_loop') as mock_run, \
              patch('sys.argv', ['hubspot-crawl', '--url', 'https://example.com',
                                '--mode', 'ultra-conservative', '--concurrency', '10', '--quiet']):
 
@@ -78,7 +78,7 @@ class TestPresetModes:
 
     def test_custom_override_delay(self):
         """Custom delay should override preset"""
-        with patch('hubspot_crawler.cli.asyncio.run') as mock_run, \
+        with patch('hubspot_crawler.cli._run_event_loop') as mock_run, \
              patch('sys.argv', ['hubspot-crawl', '--url', 'https://example.com',
                                '--mode', 'conservative', '--delay', '5.0', '--quiet']):
 
@@ -88,7 +88,7 @@ class TestPresetModes:
 
     def test_mode_description_printed_to_stderr(self, capsys):
         """Mode description should be printed to stderr"""
-        with patch('hubspot_crawler.cli.asyncio.run') as mock_run, \
+        with patch('hubspot_crawler.cli._run_event_loop') as mock_run, \
              patch('sys.argv', ['hubspot-crawl', '--url', 'https://example.com', '--mode', 'ultra-conservative']):
 
             main()
@@ -98,7 +98,7 @@ class TestPresetModes:
 
     def test_custom_override_message_printed(self, capsys):
         """Custom override message should be printed when parameters overridden"""
-        with patch('hubspot_crawler.cli.asyncio.run') as mock_run, \
+        with patch('hubspot_crawler.cli._run_event_loop') as mock_run, \
              patch('sys.argv', ['hubspot-crawl', '--url', 'https://example.com',
                                '--mode', 'conservative', '--concurrency', '20']):
 
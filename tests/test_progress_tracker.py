@@ -1,8 +1,13 @@
 """
 Tests for ProgressTracker class and progress reporting functionality
 """
+import asyncio
+import io
 import time
-from hubspot_crawler.crawler import ProgressTracker
+from unittest.mock import MagicMock, patch
+
+import pytest
+from hubspot_crawler.crawler import ProgressTracker, stderr_logger
 
 
 class TestProgressTrackerInit:
@@ -76,6 +81,20 @@ class TestProgressTrackerUpdateFromResult:
         tracker.update_from_result(result)
         assert tracker.hubspot_found == 0
 
+    def test_update_counts_legacy_cta_only_as_hubspot(self):
+        tracker = ProgressTracker(total_urls=10)
+        result = {
+            "summary": {
+                "tracking": False,
+                "cmsHosting": False,
+                "features": {"ctasLegacy": True},
+                "confidence": "moderate"
+            },
+            "hubIds": []
+        }
+        tracker.update_from_result(result)
+        assert tracker.hubspot_found == 1
+
     def test_update_tracks_tracking(self):
         tracker = ProgressTracker(total_urls=10)
         result = {
@@ -353,3 +372,68 @@ class TestProgressTrackerOutputFormats:
         assert data["hubspot_detection"]["unique_hub_ids"] == 3
         assert "performance" in data
         assert "confidence" in data
+
+
+class TestStderrLogger:
+    """Test the coalescing stderr logger coroutine"""
+
+    @staticmethod
+    def _stderr():
+        """Text stream over a BytesIO, like the real sys.stderr"""
+        raw = io.BytesIO()
+        return io.TextIOWrapper(raw, encoding="utf-8", errors="backslashreplace"), raw
+
+    @pytest.mark.asyncio
+    async def test_queued_lines_written_in_one_call(self):
+        queue = asyncio.Queue()
+        for line in ("one", "two", "three", None):
+            queue.put_nowait(line)
+
+        fake_stderr, raw = self._stderr()
+        with patch("hubspot_crawler.crawler.sys.stderr", fake_stderr), \
+             patch.object(fake_stderr.buffer, "write", wraps=fake_stderr.buffer.write) as write:
+            await stderr_logger(queue)
+
+        write.assert_called_once_with(b"one\ntwo\nthree\n")
+        assert raw.getvalue() == b"one\ntwo\nthree\n"
+
+    @pytest.mark.asyncio
+    async def test_batch_size_caps_each_write(self):
+        queue = asyncio.Queue()
+        for i in range(5):
+            queue.put_nowait(str(i))
+        queue.put_nowait(None)
+
+        fake_stderr, _ = self._stderr()
+        with patch("hubspot_crawler.crawler.sys.stderr", fake_stderr), \
+             patch.object(fake_stderr.buffer, "write", wraps=fake_stderr.buffer.write) as write:
+            await stderr_logger(queue, batch_size=2)
+
+        writes = [c.args[0] for c in write.call_args_list]
+        assert writes == [b"0\n1\n", b"2\n3\n", b"4\n"]
+
+    @pytest.mark.asyncio
+    async def test_non_ascii_encoded_with_stream_encoding(self):
+        """Emoji status lines survive the bytes path"""
+        queue = asyncio.Queue()
+        queue.put_nowait("✅ done")
+        queue.put_nowait(None)
+
+        fake_stderr, raw = self._stderr()
+        with patch("hubspot_crawler.crawler.sys.stderr", fake_stderr):
+            await stderr_logger(queue)
+
+        assert raw.getvalue().decode("utf-8") == "✅ done\n"
+
+    @pytest.mark.asyncio
+    async def test_text_only_stream_fallback(self):
+        """Streams without a binary buffer get text writes"""
+        queue = asyncio.Queue()
+        queue.put_nowait("one")
+        queue.put_nowait(None)
+
+        fake_stderr = io.StringIO()
+        with patch("hubspot_crawler.crawler.sys.stderr", fake_stderr):
+            await stderr_logger(queue)
+
+        assert fake_stderr.getvalue() == "one\n"
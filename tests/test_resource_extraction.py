@@ -0,0 +1,143 @@
+"""
+Tests for extract_resource_urls (static-mode network evidence source).
+
+Covers:
+- script/link/iframe attribute extraction
+- Document-order deduplication
+- Relative URL resolution
+- Exclusion of navigation links
+- Empty and XHTML documents
+- process_url parses each page only once
+- Tagless bodies skip parsing
+- selectolax and lxml backends agree
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from hubspot_crawler import crawler
+from hubspot_crawler.crawler import extract_resource_urls
+
+
+class TestExtractResourceUrls:
+    """Test resource URL extraction from HTML"""
+
+    def test_extracts_script_link_iframe(self):
+        """Should return src/href of scripts, stylesheets and iframes"""
+        html = """
+        <html><head>
+            <script src="https://js.hs-scripts.com/123.js"></script>
+            <link rel="stylesheet" href="https://cdn.example.com/site.css">
+        </head><body>
+            <iframe src="https://meetings.hubspot.com/user"></iframe>
+        </body></html>
+        """
+        urls = extract_resource_urls(html, "https://example.com/")
+        assert sorted(urls) == [
+            "https://cdn.example.com/site.css",
+            "https://js.hs-scripts.com/123.js",
+            "https://meetings.hubspot.com/user",
+        ]
+
+    def test_resolves_relative_urls(self):
+        """Relative and protocol-relative URLs are joined with the base URL"""
+        html = '<script src="/js/app.js"></script><script src="//js.hs-scripts.com/1.js"></script>'
+        urls = extract_resource_urls(html, "https://example.com/page/")
+        assert sorted(urls) == ["https://example.com/js/app.js", "https://js.hs-scripts.com/1.js"]
+
+    def test_ignores_anchor_links_and_empty_attributes(self):
+        """<a> links and empty src values are not resources"""
+        html = '<a href="https://hubspot.com">link</a><script src=""></script><script>inline()</script>'
+        assert extract_resource_urls(html, "https://example.com/") == []
+
+    def test_deduplicates(self):
+        """The same resource referenced twice is returned once"""
+        html = '<script src="/a.js"></script><script src="/a.js"></script>'
+        assert extract_resource_urls(html, "https://example.com/") == ["https://example.com/a.js"]
+
+    def test_document_order(self):
+        """URLs come back in the order they appear, whatever the tag"""
+        html = ('<iframe src="/c"></iframe><script src="/a.js"></script>'
+                '<link href="/b.css"><script src="/c"></script>')
+        assert extract_resource_urls(html, "https://example.com/") == [
+            "https://example.com/c", "https://example.com/a.js", "https://example.com/b.css"
+        ]
+
+    def test_empty_html(self):
+        """Empty input yields no URLs instead of raising"""
+        assert extract_resource_urls("", "https://example.com/") == []
+
+    def test_xhtml_with_encoding_declaration(self):
+        """Documents with an XML encoding declaration still parse"""
+        html = '<?xml version="1.0" encoding="UTF-8"?><html><head><script src="/x.js"></script></head></html>'
+        assert extract_resource_urls(html, "https://example.com/") == ["https://example.com/x.js"]
+
+
+class TestSingleParse:
+    """Test that process_url shares one parsed tree between extractors"""
+
+    @pytest.mark.asyncio
+    async def test_process_url_parses_once(self):
+        """Resources and metadata come from a single parse"""
+        html = ('<html><head><title>Home</title>'
+                '<script src="https://js.hs-scripts.com/123.js"></script></head></html>')
+        response = MagicMock()
+        response.text = html
+        response.headers = {}
+        response.status_code = 200
+        response.url = "https://example.com/"
+        client = AsyncMock()
+        client.get.return_value = response
+
+        with patch('hubspot_crawler.crawler._parse_and_extract', wraps=crawler._parse_and_extract) as parse:
+            result = await crawler.process_url("https://example.com/", "https://example.com/",
+                                               client, render=False, validate=False)
+
+        assert parse.call_count == 1
+        assert result["page_metadata"]["title"] == "Home"
+        assert result["hubIds"] == [123]
+
+    @pytest.mark.asyncio
+    async def test_tagless_body_not_parsed(self):
+        """Plain-text error bodies skip the parser entirely"""
+        response = MagicMock()
+        response.text = "Service Unavailable"
+        response.headers = {}
+        response.status_code = 503
+        response.url = "https://example.com/"
+        client = AsyncMock()
+        client.get.return_value = response
+
+        with patch('hubspot_crawler.crawler._parse_html') as parse_lxml, \
+             patch('hubspot_crawler.crawler._extract_with_lexbor') as parse_lexbor:
+            result = await crawler.process_url("https://example.com/", "https://example.com/",
+                                               client, render=False, validate=False)
+
+        parse_lxml.assert_not_called()
+        parse_lexbor.assert_not_called()
+        assert result["page_metadata"] == {"title": None, "description": None}
+        assert result["http_status"] == 503
+
+
+class TestParserBackends:
+    """Test that the optional selectolax backend matches lxml"""
+
+    def test_lexbor_matches_lxml(self):
+        """Both backends return the same metadata and resource URLs"""
+        pytest.importorskip("selectolax")
+        html = """
+        <html><head>
+            <title>  Acme Home </title>
+            <meta name="description" content=" Widgets ">
+            <script src="//js.hs-scripts.com/123.js"></script>
+            <link rel="stylesheet" href="/site.css">
+        </head><body>
+            <a href="https://hubspot.com">nav</a>
+            <iframe src="https://meetings.hubspot.com/user"></iframe>
+        </body></html>
+        """
+        base = "https://example.com/"
+        meta, urls = crawler._extract_with_lexbor(html, base, True)
+        doc = crawler._parse_html(html)
+
+        assert meta == crawler._metadata_from_doc(doc)
+        assert urls == crawler._resource_urls_from_doc(doc, base)
@@ -0,0 +1,64 @@
+"""
+Tests for run()'s fixed worker pool.
+
+Covers:
+- run() keeps a fixed pool of worker tasks
+- The pool size bounds concurrent fetches
+"""
+
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from hubspot_crawler.crawler import run
+
+
+class TestWorkerPool:
+    """Test that run() bounds live tasks by concurrency, not URL count"""
+
+    @pytest.mark.asyncio
+    async def test_task_count_independent_of_url_count(self, mock_http_client):
+        """50 URLs at concurrency 3 never create a task per URL"""
+        fetched = []
+        peak_tasks = [0]
+
+        async def mock_get(url, **kwargs):
+            peak_tasks[0] = max(peak_tasks[0], len(asyncio.all_tasks()))
+            fetched.append(url)
+            await asyncio.sleep(0)
+            response = MagicMock()
+            response.text = "<html></html>"
+            response.headers = {}
+            response.status_code = 200
+            response.url = url
+            return response
+
+        urls = [f"https://site{i}.com" for i in range(50)]
+        mock_http_client.get = mock_get
+        await run(urls, concurrency=3, delay=0.0, jitter=0.0, quiet=True, max_per_domain=1)
+
+        assert sorted(fetched) == sorted(urls)
+        assert peak_tasks[0] < 20
+
+    @pytest.mark.asyncio
+    async def test_in_flight_fetches_bounded_by_concurrency(self, mock_http_client):
+        """At most `concurrency` URLs are fetched at once"""
+        in_flight = [0]
+        peak = [0]
+
+        async def mock_get(url, **kwargs):
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+            await asyncio.sleep(0.001)
+            in_flight[0] -= 1
+            response = MagicMock()
+            response.text = "<html></html>"
+            response.headers = {}
+            response.status_code = 200
+            response.url = url
+            return response
+
+        urls = [f"https://site{i}.com" for i in range(20)]
+        mock_http_client.get = mock_get
+        await run(urls, concurrency=4, delay=0.0, jitter=0.0, quiet=True, max_per_domain=1)
+
+        assert peak[0] == 4